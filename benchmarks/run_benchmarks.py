@@ -0,0 +1,189 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+import sqlglot
+from modules.dataset import BASE_DIR, DATASET_PATH, TABLES_PATH, load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+from modules.instrumentation import percentile
+
+STAGES = ("parse_and_optimize", "normalize_ast", "extract_features", "evaluate", "evaluate_cached")
+
+def load_corpus(dataset_path: str = DATASET_PATH, tables_path: str = TABLES_PATH,
+                limit: Optional[int] = None) -> Tuple[List[Tuple[str, List[str], List[str]]], Dict[str, Any]]:
+    questions = load_questions(dataset_path)[:limit]
+    schemas = load_schemas(tables_path)
+    return [(q["db_id"], ground_truths(q), submissions(q)) for q in questions], schemas
+
+class StageBench:
+    def __init__(self, corpus, schemas):
+        self.corpus = corpus
+        self.graders = {db_id: Grader(schemas[db_id], cache_size=0) for db_id, _, _ in corpus}
+        self.cached_graders = {db_id: Grader(schemas[db_id]) for db_id, _, _ in corpus}
+        self.parsed = []
+        self.normalized = []
+
+        for db_id, _, subs in corpus:
+            grader = self.graders[db_id]
+            for sql in subs:
+                ast = grader.processor.parse_and_optimize(sql)
+                if ast is None: continue
+                self.parsed.append((db_id, ast))
+                self.normalized.append((db_id, grader._normalize_ast(ast.copy())))
+
+    def operations(self, stage: str) -> List[Callable[[], Any]]:
+        if stage == "parse_and_optimize":
+            return [lambda p=self.graders[db_id].processor, s=sql: p.parse_and_optimize(s)
+                    for db_id, _, subs in self.corpus for sql in subs]
+        if stage == "normalize_ast":
+            return [lambda g=self.graders[db_id], a=ast: g._normalize_ast(a.copy()) for db_id, ast in self.parsed]
+        if stage == "extract_features":
+            return [lambda g=self.graders[db_id], a=ast: g._extract_features(a) for db_id, ast in self.normalized]
+        if stage == "evaluate":
+            return [lambda g=self.graders[db_id], s=sql, t=gts: g.evaluate(s, t)
+                    for db_id, gts, subs in self.corpus for sql in subs]
+        if stage == "evaluate_cached":
+            return [lambda g=self.cached_graders[db_id], s=sql, t=gts: g.evaluate(s, t)
+                    for db_id, gts, subs in self.corpus for sql in subs]
+        raise ValueError(f"Unknown stage '{stage}'.")
+
+def _time_stage(operations: List[Callable[[], Any]], repeat: int, warmup: int, memory_sample: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        for op in operations:
+            op()
+
+    latencies = []
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for op in operations:
+            t0 = time.perf_counter()
+            op()
+            latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    for op in operations[:memory_sample]:
+        op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / total, 2) if total else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 4) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def run_benchmarks(stages=STAGES, repeat: int = 3, warmup: int = 1, limit: Optional[int] = None,
+                   memory_sample: int = 100, dataset_path: str = DATASET_PATH, tables_path: str = TABLES_PATH) -> Dict[str, Any]:
+    corpus, schemas = load_corpus(dataset_path, tables_path, limit)
+    results = {}
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        bench = StageBench(corpus, schemas)
+        for stage in stages:
+            results[stage] = _time_stage(bench.operations(stage), repeat, warmup, memory_sample)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlglot": sqlglot.__version__,
+            "questions": len(corpus),
+            "submissions": sum(len(subs) for _, _, subs in corpus),
+            "repeat": repeat,
+            "memory_sample": memory_sample
+        },
+        "stages": results
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    rows = []
+    for stage, base in baseline["stages"].items():
+        new = current["stages"].get(stage)
+        if new is None: continue
+
+        throughput = new["ops_per_sec"] / base["ops_per_sec"] - 1 if base["ops_per_sec"] else 0.0
+        tail = new["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rows.append({
+            "stage": stage,
+            "ops_per_sec": (base["ops_per_sec"], new["ops_per_sec"], round(throughput * 100, 1)),
+            "p95_ms": (base["p95_ms"], new["p95_ms"], round(tail * 100, 1)),
+            "regression": throughput < -threshold or tail > threshold
+        })
+    return rows
+
+def _print_results(report: Dict[str, Any]):
+    meta = report["meta"]
+    print(f"commit={meta['commit']} python={meta['python']} sqlglot={meta['sqlglot']} "
+          f"questions={meta['questions']} submissions={meta['submissions']} repeat={meta['repeat']}")
+    print(f"{'stage':<20}{'ops/sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KB':>12}")
+    for stage, r in report["stages"].items():
+        print(f"{stage:<20}{r['ops_per_sec']:>12.1f}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['peak_kb']:>12.1f}")
+
+def _print_comparison(rows: List[Dict[str, Any]], threshold: float):
+    print(f"{'stage':<20}{'ops/sec base -> new':>28}{'p95 ms base -> new':>28}  status")
+    for row in rows:
+        ob, on, od = row["ops_per_sec"]
+        pb, pn, pd = row["p95_ms"]
+        status = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['stage']:<20}{f'{ob:.1f} -> {on:.1f} ({od:+.1f}%)':>28}{f'{pb:.3f} -> {pn:.3f} ({pd:+.1f}%)':>28}  {status}")
+    print(f"threshold: {threshold * 100:.0f}%")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AssessQL grading benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark suite")
+    run.add_argument("--output", help="Write results as JSON to this path")
+    run.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--limit", type=int, help="Only use the first N questions")
+    run.add_argument("--memory-sample", type=int, default=100, help="Operations traced for peak memory (default: 100)")
+
+    cmp_parser = commands.add_parser("compare", help="Compare two result files")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown (default: 0.10)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_benchmarks(args.stages, args.repeat, args.warmup, args.limit, args.memory_sample)
+        _print_results(report)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    _print_comparison(rows, args.threshold)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import List, Dict, Any, Optional, Iterator, Iterable, TextIO
+from .instrumentation import Instrumentation, TimingSummary
+from .metrics import REGISTRY
+from .grader import failed_result, is_failed
+from .parallel import ParallelGrader
+from .question_bank import QuestionBank, QuestionCache
+from .result_cache import ResultCache
+
+class Progress:
+    def __init__(self, stream: TextIO, interval: float = 0.5):
+        self.stream = stream
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last = 0.0
+        self.graded = 0
+        self.errors = 0
+        self.timings: Optional[TimingSummary] = None
+
+    def record(self, result: Dict[str, Any]):
+        if self.timings is not None and result.get("timings"):
+            self.timings.add(result["timings"])
+
+    def update(self, graded: int, errors: int, force: bool = False):
+        self.graded += graded
+        self.errors += errors
+        now = time.monotonic()
+        if not force and now - self.last < self.interval:
+            return
+
+        self.last = now
+        elapsed = now - self.started
+        rate = self.graded / elapsed if elapsed > 0 else 0.0
+        self.stream.write(f"\r[assessql] graded {self.graded} ({self.errors} errors) | {rate:.1f} submissions/s | {elapsed:.1f}s")
+        self.stream.flush()
+
+    def finish(self):
+        self.update(0, 0, force=True)
+        self.stream.write("\n")
+        if self.timings is not None:
+            self.stream.write(self.timings.format() + "\n")
+        self.stream.flush()
+
+def read_submissions(stream: Iterable[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+        return
+
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line: continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"submission_id": None, "error": f"Invalid JSON on line {line_no}: {e.msg}"}
+            continue
+        if not isinstance(record, dict):
+            record = {"submission_id": None, "error": f"Expected a JSON object on line {line_no}."}
+        yield record
+
+def _record_error(record: Dict[str, Any], bank: QuestionBank) -> Optional[str]:
+    if record.get("error"):
+        return record["error"]
+    sql = record.get("sql")
+    if not isinstance(sql, str) or not sql.strip():
+        return "Missing 'sql' field."
+    if str(record.get("question_id")) not in bank.questions:
+        return f"Unknown question_id '{record.get('question_id')}'."
+    return None
+
+def _output(record: Dict[str, Any], result: Dict[str, Any]) -> str:
+    line = {"submission_id": record.get("submission_id"), "question_id": record.get("question_id")}
+    line.update(result)
+    return json.dumps(line)
+
+def _cached_result(record: Dict[str, Any], cache: QuestionCache, results: Optional[ResultCache]):
+    if results is None:
+        return None, None
+    question_id = str(record["question_id"])
+    key = (cache.fingerprint(question_id), cache.submission_key(question_id, record["sql"]))
+    return key, results.get(*key)
+
+def grade_serial(records: Iterable[Dict[str, Any]], cache: QuestionCache, out: TextIO, progress: Progress,
+                 results: Optional[ResultCache] = None):
+    for record in records:
+        error = _record_error(record, cache.bank)
+        if error:
+            out.write(_output(record, {"error": error}) + "\n")
+            progress.update(1, 1)
+            continue
+
+        key, result = _cached_result(record, cache, results)
+        if result is None:
+            question_id = str(record["question_id"])
+            schema_name, _ = cache.bank.questions[question_id]
+            try:
+                result = cache.grader(schema_name).evaluate_compiled(record["sql"], cache.question(question_id))
+            except Exception as e:
+                result = failed_result(e)
+            else:
+                if key:
+                    results.put(*key, result)
+        out.write(_output(record, result) + "\n")
+        progress.record(result)
+        progress.update(1, "error" in result)
+
+def grade_parallel(records: Iterable[Dict[str, Any]], cache: QuestionCache, out: TextIO, progress: Progress,
+                   jobs: int, window: int, results: Optional[ResultCache] = None):
+    with ParallelGrader(cache.bank.schemas, jobs=jobs, instrument=cache.instrumentation is not None) as pool:
+        records = iter(records)
+        while True:
+            batch = list(itertools.islice(records, window))
+            if not batch:
+                break
+
+            groups: Dict[str, List[int]] = {}
+            graded: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+            keys = [None] * len(batch)
+            for idx, record in enumerate(batch):
+                error = _record_error(record, cache.bank)
+                if error:
+                    graded[idx] = {"error": error}
+                    continue
+
+                keys[idx], graded[idx] = _cached_result(record, cache, results)
+                if graded[idx] is None:
+                    groups.setdefault(str(record["question_id"]), []).append(idx)
+
+            tasks = []
+            for question_id, members in groups.items():
+                schema_name, _ = cache.bank.questions[question_id]
+                tasks.append(([batch[idx]["sql"] for idx in members], cache.question(question_id), schema_name))
+
+            for members, chunk in zip(groups.values(), pool.evaluate_many(tasks)):
+                for idx, result in zip(members, chunk):
+                    graded[idx] = result
+                    if keys[idx] and not is_failed(result):
+                        results.put(*keys[idx], result)
+
+            for record, result in zip(batch, graded):
+                out.write(_output(record, result) + "\n")
+                progress.record(result)
+            progress.update(len(batch), sum("error" in result for result in graded))
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+def grade_command(args: argparse.Namespace) -> int:
+    try:
+        bank = QuestionBank.load(args.questions)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not load question bank '{args.questions}': {e}", file=sys.stderr)
+        return 2
+
+    out = sys.stdout
+    cache = QuestionCache(bank, args.cache_dir, Instrumentation() if args.timings else None)
+    results = None
+    if args.cache_dir and not args.no_result_cache:
+        results = ResultCache(os.path.join(args.cache_dir, "results.sqlite"), max_entries=args.result_cache_size)
+    progress = Progress(sys.stderr, args.progress_interval)
+    if args.timings:
+        progress.timings = TimingSummary()
+    fmt = _detect_format(args.input, args.format)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", newline="")
+    diagnostics = sys.stderr if args.verbose else open(os.devnull, "w")
+    exporter = REGISTRY.serve(args.metrics_host, args.metrics_port) if args.metrics_port is not None else None
+    try:
+        records = read_submissions(stream, fmt)
+        if args.limit is not None:
+            records = itertools.islice(records, args.limit)
+
+        with redirect_stdout(diagnostics):
+            if args.jobs > 1:
+                grade_parallel(records, cache, out, progress, args.jobs, args.window, results)
+            else:
+                grade_serial(records, cache, out, progress, results)
+    finally:
+        out.flush()
+        progress.finish()
+        if stream is not sys.stdin:
+            stream.close()
+        if diagnostics is not sys.stderr:
+            diagnostics.close()
+        if results:
+            results.close()
+            if args.verbose:
+                print(f"[assessql] result cache: {results.hits} hits, {results.misses} misses, "
+                      f"{results.evictions} evicted, {results.invalidated} stale entries dropped", file=sys.stderr)
+        if args.metrics_file:
+            REGISTRY.write(args.metrics_file)
+        if exporter:
+            exporter.shutdown()
+
+    return 0
+
+def serve_command(args: argparse.Namespace) -> int:
+    from .service import serve
+
+    try:
+        bank = QuestionBank.load(args.questions)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not load question bank '{args.questions}': {e}", file=sys.stderr)
+        return 2
+
+    if args.metrics_port is not None:
+        REGISTRY.serve(args.metrics_host, args.metrics_port)
+
+    try:
+        asyncio.run(serve(bank, args.host, args.port, cache_dir=args.cache_dir, jobs=args.jobs,
+                          max_batch=args.max_batch, max_delay=args.max_delay / 1000, max_pending=args.max_pending))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="assessql", description="AssessQL grading tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    grade = commands.add_parser("grade", help="Grade a stream of submissions and write JSONL results to stdout")
+    grade.add_argument("input", nargs="?", default="-", help="JSONL or CSV file with submission_id, question_id, sql (default: stdin)")
+    grade.add_argument("-q", "--questions", required=True, help="Question bank JSON with schemas and ground truths")
+    grade.add_argument("--format", choices=("jsonl", "csv"), help="Input format (default: from extension, else jsonl)")
+    grade.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1)")
+    grade.add_argument("--window", type=int, default=512, help="Submissions buffered per parallel round (default: 512)")
+    grade.add_argument("--cache-dir", help="Directory for persisted compiled questions and graded results")
+    grade.add_argument("--no-result-cache", action="store_true", help="Regrade every submission even when --cache-dir holds a stored result")
+    grade.add_argument("--result-cache-size", type=int, default=500_000, help="Stored results kept before least recently used are evicted (default: 500000)")
+    grade.add_argument("--limit", type=int, help="Stop after this many submissions")
+    grade.add_argument("--progress-interval", type=float, default=0.5, help="Seconds between progress updates on stderr")
+    grade.add_argument("--verbose", action="store_true", help="Forward parser diagnostics to stderr")
+    grade.add_argument("--timings", action="store_true", help="Add per-stage timings to each result and print a summary on stderr")
+    grade.add_argument("--metrics-file", help="Write Prometheus text metrics to this file when the run ends")
+    grade.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port while grading")
+    grade.add_argument("--metrics-host", default="127.0.0.1")
+    grade.set_defaults(handler=grade_command)
+
+    service = commands.add_parser("serve", help="Run the HTTP grading service (POST /grade, GET /metrics)")
+    service.add_argument("-q", "--questions", required=True, help="Question bank JSON with schemas and ground truths")
+    service.add_argument("--host", default="127.0.0.1")
+    service.add_argument("--port", type=int, default=8080)
+    service.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1, grades in a background thread)")
+    service.add_argument("--cache-dir", help="Directory for persisted compiled questions")
+    service.add_argument("--max-batch", type=int, default=32, help="Flush a question's batch at this size (default: 32)")
+    service.add_argument("--max-delay", type=float, default=5.0, help="Flush a question's batch after this many ms (default: 5)")
+    service.add_argument("--max-pending", type=int, default=1024, help="Reject with 503 beyond this many queued submissions")
+    service.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    service.add_argument("--metrics-host", default="127.0.0.1")
+    service.set_defaults(handler=serve_command)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,378 @@
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+from typing import List, Dict, Any, Optional, Tuple
+
+GENERATOR_VERSION = 2
+
+_TYPE_NAMES = r"varchar2|varchar|char|character|text|string|integer|int|smallint|bigint|number|numeric|decimal|float|real|double|date|datetime|timestamp|boolean|bool"
+_COLUMN_LINE_RE = re.compile(rf"^\s*(.+?)\s+({_TYPE_NAMES})\s*(\(\s*\d+(?:\s*,\s*\d+)?\s*\))?(?:\s+(.*?))?\s*,?\s*$", re.IGNORECASE)
+_CREATE_RE = re.compile(r"CREATE\s+TABLE\s+(\S+)\s*\((.*?)\n\s*\)\s*;", re.IGNORECASE | re.DOTALL)
+_LENGTH_RE = re.compile(r"\(\s*(\d+)")
+
+_PK_RE = re.compile(r"\b(pk|primary\s*key)\b", re.IGNORECASE)
+_COMPOSITE_PK_RE = re.compile(r"primary\s*key\s+as\s+combination\s+of\s+([\w\s,]+)", re.IGNORECASE)
+_NOT_NULL_RE = re.compile(r"\bnot\s*null\b|\bnot\s+be\s+left\s+blank\b|\bmandatory\b", re.IGNORECASE)
+_REFERS_RE = re.compile(r"refer(?:s|ences)?\s+(?:to\s+)?(\w+)(?:\s+(?:of|in|from))?\s+(\w+)", re.IGNORECASE)
+_FOREIGN_KEY_RE = re.compile(r"\bforeign\s*key\b", re.IGNORECASE)
+_CHOICES_RE = re.compile(r"'(\w+)'|\b(\w)\b(?=\s+as\s+values|\s*,?\s*$)")
+_GREATER_RE = re.compile(r"(?:>|greater\s+than)\s*(\w+)", re.IGNORECASE)
+_NOT_GREATER_RE = re.compile(r"not\s+(?:be\s+)?greater\s+than\s+(\w+)", re.IGNORECASE)
+
+_BASE_DATE = datetime.date(1980, 1, 1)
+_BOUND_KINDS = {"integer": "number", "real": "number", "date": "date"}
+
+def sanitize_identifier(name: str) -> str:
+    clean = re.sub(r"\W+", "_", name.strip().lower()).strip("_")
+    return clean or "col"
+
+def parse_schema_sql(text: str) -> Dict[str, Dict[str, Dict[str, str]]]:
+    schema = {}
+    for table_name, body in _CREATE_RE.findall(text):
+        columns = {}
+        for line in body.splitlines():
+            match = _COLUMN_LINE_RE.match(line)
+            if not match: continue
+            name, col_type, length, constraint = match.groups()
+            columns[name.strip().lower()] = {
+                "type": (col_type + (length or "")).lower(),
+                "constraint": (constraint or "").strip()
+            }
+        schema[table_name.upper()] = columns
+    return schema
+
+def load_schema_sql(path: str) -> Dict[str, Dict[str, Dict[str, str]]]:
+    with open(path, "r") as f:
+        return parse_schema_sql(f.read())
+
+def _affinity(col_type: str) -> str:
+    base = col_type.split("(")[0].strip().lower()
+    if base in ("integer", "int", "smallint", "bigint", "number", "numeric", "decimal", "boolean", "bool"):
+        return "integer"
+    if base in ("float", "real", "double"):
+        return "real"
+    if base in ("date", "datetime", "timestamp"):
+        return "date"
+    return "text"
+
+def _max_length(col_type: str) -> Optional[int]:
+    match = _LENGTH_RE.search(col_type)
+    if match:
+        return int(match.group(1))
+    if col_type.strip().lower() in ("char", "character"):
+        return 1
+    return None
+
+class ColumnSpec:
+    def __init__(self, name: str, col_type: str, constraint: str):
+        self.name = sanitize_identifier(name)
+        self.affinity = _affinity(col_type)
+        self.length = _max_length(col_type)
+        self.constraint = constraint
+        self.primary_key = bool(_PK_RE.search(constraint)) and not _COMPOSITE_PK_RE.search(constraint)
+        self.not_null = self.primary_key or bool(_NOT_NULL_RE.search(constraint))
+        self.references: Optional[Tuple[str, str]] = None
+        self.choices = self._parse_choices(constraint)
+        self.lower_bound, self.upper_bound = self._parse_bounds(constraint)
+
+    def _parse_choices(self, constraint: str) -> List[str]:
+        if not re.search(r"\b(contain|values|either|one\s+of)\b", constraint, re.IGNORECASE):
+            return []
+        choices = [quoted or bare for quoted, bare in _CHOICES_RE.findall(constraint)]
+        return list(dict.fromkeys(c for c in choices if c))
+
+    def _parse_bounds(self, constraint: str) -> Tuple[Any, Any]:
+        upper = _NOT_GREATER_RE.search(constraint)
+        if upper:
+            return None, self._bound_value(upper.group(1))
+        lower = _GREATER_RE.search(constraint)
+        if lower:
+            return self._bound_value(lower.group(1)), None
+        return None, None
+
+    def _bound_value(self, token: str) -> Any:
+        return int(token) if token.isdigit() else sanitize_identifier(token)
+
+    def ddl(self) -> str:
+        sql_type = {"integer": "INTEGER", "real": "REAL", "date": "DATE"}.get(self.affinity, "TEXT")
+        if self.affinity == "text" and self.length:
+            sql_type = f"VARCHAR({self.length})"
+        parts = [f'"{self.name}"', sql_type]
+        if self.not_null:
+            parts.append("NOT NULL")
+        return " ".join(parts)
+
+class TableSpec:
+    def __init__(self, name: str, columns: Dict[str, Dict[str, str]]):
+        self.name = sanitize_identifier(name)
+        self.columns: List[ColumnSpec] = []
+        self.primary_key: List[str] = []
+
+        for col_name, info in columns.items():
+            if isinstance(info, str):
+                info = {"type": info, "constraint": ""}
+            self.columns.append(ColumnSpec(col_name, info.get("type", "text"), info.get("constraint", "") or ""))
+
+        names = {c.name for c in self.columns}
+        self.primary_key = [c.name for c in self.columns if c.primary_key]
+        for column in self.columns:
+            composite = _COMPOSITE_PK_RE.search(column.constraint)
+            if not composite: continue
+            key = [sanitize_identifier(k) for k in composite.group(1).split(",") if k.strip()]
+            if key and all(k in names for k in key):
+                self.primary_key = key
+
+        for column in self.columns:
+            if column.name in self.primary_key:
+                column.not_null = True
+
+    def column(self, name: str) -> Optional[ColumnSpec]:
+        for column in self.columns:
+            if column.name == name:
+                return column
+        return None
+
+    def ddl(self, tables: Dict[str, "TableSpec"]) -> str:
+        lines = [c.ddl() for c in self.columns]
+        if self.primary_key:
+            lines.append(f"PRIMARY KEY ({', '.join(_quote(k) for k in self.primary_key)})")
+        for column in self.columns:
+            if not column.references: continue
+            target_table, target_column = column.references
+            if tables[target_table].primary_key == [target_column]:
+                lines.append(f'FOREIGN KEY ("{column.name}") REFERENCES "{target_table}" ("{target_column}")')
+        body = ",\n  ".join(lines)
+        return f'CREATE TABLE "{self.name}" (\n  {body}\n)'
+
+def _quote(name: str) -> str:
+    return f'"{name}"'
+
+def compile_specs(schema: Dict[str, Dict[str, Any]]) -> Dict[str, TableSpec]:
+    tables = {}
+    for name, columns in schema.items():
+        spec = TableSpec(name, columns)
+        tables[spec.name] = spec
+
+    for table in tables.values():
+        for column in table.columns:
+            column.references = _resolve_reference(column, table, tables)
+    return tables
+
+def _resolve_reference(column: ColumnSpec, table: TableSpec, tables: Dict[str, TableSpec]) -> Optional[Tuple[str, str]]:
+    match = _REFERS_RE.search(column.constraint)
+    if match:
+        target_column = sanitize_identifier(match.group(1))
+        target_table = sanitize_identifier(match.group(2))
+        if target_table in tables and tables[target_table].column(target_column):
+            return target_table, target_column
+        owners = [t.name for t in tables.values() if t.column(target_column) and t.column(target_column).primary_key]
+        owners = owners or [t.name for t in tables.values() if t.column(target_column)]
+        if owners:
+            return owners[0], target_column
+        return None
+
+    if _FOREIGN_KEY_RE.search(column.constraint):
+        owners = [t.name for t in tables.values() if t.name != table.name and t.primary_key == [column.name]]
+        if owners:
+            return owners[0], column.name
+    return None
+
+def dependency_order(tables: Dict[str, TableSpec]) -> List[str]:
+    pending = {
+        name: {c.references[0] for c in t.columns if c.references and c.references[0] != name}
+        for name, t in tables.items()
+    }
+    order = []
+    while pending:
+        ready = [name for name, deps in pending.items() if not deps - set(order)]
+        if not ready:
+            ready = [next(iter(pending))]
+        for name in ready:
+            order.append(name)
+            del pending[name]
+    return order
+
+class InstanceBuilder:
+    def __init__(self, tables: Dict[str, TableSpec], seed: int, rows: int = 20, null_rate: float = 0.1,
+                 domains: Optional[Dict[str, Dict[str, List[Any]]]] = None, spread: Optional[int] = None):
+        self.tables = tables
+        self.rng = random.Random(seed)
+        self.rows = rows
+        self.spread = spread or max(2, rows // 2)
+        self.null_rate = null_rate
+        self.domains = domains or {}
+        self.data: Dict[str, List[Dict[str, Any]]] = {}
+
+    def build(self) -> Dict[str, List[Dict[str, Any]]]:
+        for name in dependency_order(self.tables):
+            self.data[name] = self._build_table(self.tables[name])
+        return self.data
+
+    def _build_table(self, table: TableSpec) -> List[Dict[str, Any]]:
+        rows = []
+        seen_keys = set()
+        attempts = 0
+        target = self.rng.randint(max(1, self.rows // 2), self.rows)
+        while len(rows) < target and attempts < self.rows * 10:
+            attempts += 1
+            row = {}
+            picked = {}
+            for column in table.columns:
+                row[column.name] = self._value(table, column, len(rows), rows, picked)
+            for column in table.columns:
+                row[column.name] = self._apply_bounds(table, column, row)
+
+            if table.primary_key:
+                key = tuple(row[k] for k in table.primary_key)
+                if key in seen_keys or None in key: continue
+                seen_keys.add(key)
+            rows.append(row)
+        return rows
+
+    def _value(self, table: TableSpec, column: ColumnSpec, index: int, rows: List[Dict[str, Any]],
+               picked: Dict[str, Dict[str, Any]]) -> Any:
+        rng = self.rng
+        if column.references:
+            target_table, target_column = column.references
+            parent = picked.get(target_table)
+            if parent is not None and parent[target_column] is not None:
+                return parent[target_column]
+
+            parents = rows if target_table == table.name else self.data.get(target_table, [])
+            pool = [r for r in parents if r[target_column] is not None]
+            if not pool:
+                return None if not column.not_null else self._fresh(column, index)
+            if not column.not_null and rng.random() < self.null_rate:
+                return None
+            parent = picked[target_table] = rng.choice(pool)
+            return parent[target_column]
+
+        if not column.not_null and column.name not in table.primary_key and rng.random() < self.null_rate:
+            return None
+
+        if column.choices:
+            return rng.choice(column.choices)
+
+        domain = self.domains.get(table.name, {}).get(column.name)
+        if domain and rng.random() < 0.5:
+            return rng.choice(domain)
+
+        if table.primary_key == [column.name]:
+            return self._fresh(column, index)
+
+        if column.affinity == "integer":
+            return rng.randint(1, 1000)
+        if column.affinity == "real":
+            return round(rng.uniform(1, 1000), 2)
+        if column.affinity == "date":
+            return (_BASE_DATE + datetime.timedelta(days=rng.randint(0, 15000))).isoformat()
+        if column.length is not None and column.length <= 2:
+            return rng.choice("ABCDEFGHIJ")[:column.length]
+        return self._truncate(column, f"{column.name}_{rng.randint(1, self.spread)}")
+
+    def _fresh(self, column: ColumnSpec, index: int) -> Any:
+        if column.affinity in ("integer", "real"):
+            return index + 1
+        if column.affinity == "date":
+            return (_BASE_DATE + datetime.timedelta(days=index)).isoformat()
+        return self._truncate(column, f"{column.name[:1].upper()}{index + 1}")
+
+    def _truncate(self, column: ColumnSpec, value: str) -> str:
+        return value[-column.length:] if column.length else value
+
+    def _bound(self, table: TableSpec, column: ColumnSpec, bound: Any, row: Dict[str, Any]) -> Any:
+        kind = _BOUND_KINDS.get(column.affinity)
+        if bound is None or kind is None:
+            return None
+        if not isinstance(bound, str):
+            return bound if kind == "number" else None
+        other = table.column(bound)
+        if other is None or _BOUND_KINDS.get(other.affinity) != kind:
+            return None
+        return row.get(bound)
+
+    def _apply_bounds(self, table: TableSpec, column: ColumnSpec, row: Dict[str, Any]) -> Any:
+        value = row[column.name]
+        if value is None or column.references or column.choices:
+            return value
+
+        bound = self._bound(table, column, column.lower_bound, row)
+        if bound is not None and value <= bound:
+            if column.affinity == "date":
+                start = datetime.date.fromisoformat(bound)
+                return (start + datetime.timedelta(days=self.rng.randint(1, 3650))).isoformat()
+            return bound + self.rng.randint(1, 1000)
+
+        bound = self._bound(table, column, column.upper_bound, row)
+        if bound is not None and column.affinity in ("integer", "real") and value > bound:
+            return self.rng.randint(0, int(bound))
+        return value
+
+def write_instance(path: str, tables: Dict[str, TableSpec], data: Dict[str, List[Dict[str, Any]]]):
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        for name in dependency_order(tables):
+            table = tables[name]
+            conn.execute(table.ddl(tables))
+            columns = [c.name for c in table.columns]
+            placeholders = ", ".join("?" for _ in columns)
+            column_list = ", ".join(_quote(c) for c in columns)
+            conn.executemany(
+                f'INSERT INTO "{name}" ({column_list}) VALUES ({placeholders})',
+                [tuple(row[c] for c in columns) for row in data[name]]
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+def schema_hash(schema: Dict[str, Any], rows: int, domains: Optional[Dict[str, Any]] = None,
+                spread: Optional[int] = None, null_rate: Optional[float] = None) -> str:
+    payload = {"schema": schema, "rows": rows, "version": GENERATOR_VERSION}
+    if domains:
+        payload["domains"] = domains
+    if spread:
+        payload["spread"] = spread
+    if null_rate is not None:
+        payload["null_rate"] = null_rate
+    payload = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+class DataGenerator:
+    def __init__(self, cache_dir: str, rows: int = 20, null_rate: float = 0.1, spread: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.rows = rows
+        self.spread = spread
+        self.null_rate = null_rate
+        self.built = 0
+
+    def instance_dir(self, schema: Dict[str, Any], domains: Optional[Dict[str, Any]] = None) -> str:
+        return os.path.join(self.cache_dir, schema_hash(schema, self.rows, domains, self.spread, self.null_rate))
+
+    def instance_path(self, schema: Dict[str, Any], seed: int, domains: Optional[Dict[str, Any]] = None) -> str:
+        db_id = f"instance_{seed}"
+        return os.path.join(self.instance_dir(schema, domains), db_id, f"{db_id}.sqlite")
+
+    def generate(self, schema: Dict[str, Any], seeds: Any = 3,
+                 domains: Optional[Dict[str, Dict[str, List[Any]]]] = None) -> Tuple[str, List[str]]:
+        tables = None
+        db_ids = []
+        for seed in (range(seeds) if isinstance(seeds, int) else seeds):
+            path = self.instance_path(schema, seed, domains)
+            if not os.path.exists(path):
+                if tables is None:
+                    tables = compile_specs(schema)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                data = InstanceBuilder(tables, seed, self.rows, self.null_rate, domains, self.spread).build()
+                write_instance(path, tables, data)
+                self.built += 1
+            db_ids.append(f"instance_{seed}")
+        return self.instance_dir(schema, domains), db_ids
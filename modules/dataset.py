@@ -0,0 +1,79 @@
+import json
+import os
+from typing import Dict, List, Any
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CUSTOM_DATASET_DIR = os.path.join(BASE_DIR, "prev_ver", "custom_dataset")
+DATASET_PATH = os.path.join(CUSTOM_DATASET_DIR, "assessql_custom_dataset.json")
+TABLES_PATH = os.path.join(CUSTOM_DATASET_DIR, "tables.json")
+DATABASES_DIR = os.path.join(CUSTOM_DATASET_DIR, "databases")
+
+def load_questions(path: str = DATASET_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+def load_schemas(path: str = TABLES_PATH) -> Dict[str, Dict[str, Dict[str, str]]]:
+    with open(path, "r") as f:
+        entries = json.load(f)
+
+    schemas = {}
+    for entry in entries:
+        tables = entry["table_names_original"]
+        schema = {name.lower(): {} for name in tables}
+
+        for (table_idx, col_name), col_type in zip(entry["column_names_original"], entry["column_types"]):
+            if table_idx < 0: continue
+            schema[tables[table_idx].lower()][col_name.lower()] = col_type
+
+        schemas[entry["db_id"]] = schema
+
+    return schemas
+
+_GENERATOR_TYPES = {"number": "integer", "text": "varchar", "time": "date", "boolean": "integer", "others": "text"}
+
+def load_generator_schemas(path: str = TABLES_PATH) -> Dict[str, Dict[str, Dict[str, Dict[str, str]]]]:
+    with open(path, "r") as f:
+        entries = json.load(f)
+
+    schemas = {}
+    for entry in entries:
+        tables = entry["table_names_original"]
+        columns = entry["column_names_original"]
+        constraints = {idx: [] for idx in range(len(columns))}
+
+        keys_by_table = {}
+        for key in entry["primary_keys"]:
+            key_columns = key if isinstance(key, list) else [key]
+            for idx in key_columns:
+                keys_by_table.setdefault(columns[idx][0], []).append(idx)
+
+        for key_columns in keys_by_table.values():
+            if len(key_columns) == 1:
+                constraints[key_columns[0]].append("PK")
+            else:
+                names = ",".join(columns[idx][1] for idx in key_columns)
+                for idx in key_columns:
+                    constraints[idx].append(f"Set primary key as combination of {names}")
+
+        for source, target in entry["foreign_keys"]:
+            target_table, target_column = columns[target]
+            constraints[source].append(f"Refers to {target_column} of {tables[target_table]} table")
+
+        schema = {name: {} for name in tables}
+        for idx, ((table_idx, col_name), col_type) in enumerate(zip(columns, entry["column_types"])):
+            if table_idx < 0: continue
+            schema[tables[table_idx]][col_name] = {
+                "type": _GENERATOR_TYPES.get(col_type, "text"),
+                "constraint": ", ".join(constraints[idx])
+            }
+
+        schemas[entry["db_id"]] = schema
+
+    return schemas
+
+def ground_truths(question: Dict[str, Any]) -> List[str]:
+    return question["queries"]["correct_queries"]
+
+def submissions(question: Dict[str, Any]) -> List[str]:
+    queries = question["queries"]
+    return queries["correct_queries"] + [q["query"] for q in queries["incorrect_queries"]]
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE
+}
+
+def _read_only_authorizer(action, arg1, arg2, db_name, trigger):
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+class ConnectionPool:
+    def __init__(self, db_dir: str):
+        self.db_dir = db_dir
+        self._snapshots: Dict[str, sqlite3.Connection] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def db_path(self, db_id: str) -> str:
+        return os.path.join(self.db_dir, db_id, f"{db_id}.sqlite")
+
+    def _snapshot(self, db_id: str) -> sqlite3.Connection:
+        snapshot = self._snapshots.get(db_id)
+        if snapshot is None:
+            path = self.db_path(db_id)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Database file not found: {path}")
+
+            source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                snapshot = sqlite3.connect(":memory:", check_same_thread=False)
+                source.backup(snapshot)
+            finally:
+                source.close()
+
+            self._snapshots[db_id] = snapshot
+        return snapshot
+
+    def connection(self, db_id: str) -> sqlite3.Connection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        generation = self._generations.get(db_id, 0)
+        cached = connections.get(db_id)
+        if cached and cached[0] == generation:
+            return cached[1]
+
+        if cached:
+            cached[1].close()
+
+        conn = sqlite3.connect(":memory:")
+        with self._lock:
+            self._snapshot(db_id).backup(conn)
+
+        conn.execute("PRAGMA query_only = ON")
+        conn.set_authorizer(_read_only_authorizer)
+        connections[db_id] = (generation, conn)
+        return conn
+
+    @contextmanager
+    def checkout(self, db_id: str) -> Iterator[sqlite3.Connection]:
+        conn = self.connection(db_id)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    def invalidate(self, db_id: str):
+        with self._lock:
+            snapshot = self._snapshots.pop(db_id, None)
+            if snapshot is not None:
+                snapshot.close()
+            self._generations[db_id] = self._generations.get(db_id, 0) + 1
+
+    def close(self):
+        connections = getattr(self._local, "connections", {})
+        for _, conn in connections.values():
+            conn.close()
+        connections.clear()
+
+        with self._lock:
+            for snapshot in self._snapshots.values():
+                snapshot.close()
+            self._snapshots.clear()
@@ -0,0 +1,205 @@
+import json
+import os
+from sqlglot import exp, parse_one
+from typing import List, Dict, Any, Optional, Tuple
+from .data_generator import DataGenerator, TableSpec, compile_specs, sanitize_identifier
+from .execution_grader import ExecutionGrader
+
+def _literal_value(literal: exp.Literal) -> Any:
+    if literal.is_string:
+        return literal.this
+    try:
+        number = float(literal.this)
+    except ValueError:
+        return literal.this
+    return int(number) if number.is_integer() else number
+
+def _literal_column(literal: exp.Literal) -> Optional[exp.Column]:
+    parent = literal.parent
+    if isinstance(parent, (exp.In, exp.Between)):
+        target = parent.this
+    elif isinstance(parent, (exp.Binary, exp.Like)):
+        target = parent.left if parent.right is literal else parent.right
+    else:
+        return None
+    return target if isinstance(target, exp.Column) else None
+
+def _variants(value: Any, pattern: bool) -> List[Any]:
+    if isinstance(value, str):
+        if pattern:
+            return [value.replace("%", "").replace("_", "a")]
+        return [value]
+    return [value - 1, value, value + 1]
+
+def harvest_domains(sql_queries: List[str], tables: Dict[str, TableSpec]) -> Dict[str, Dict[str, List[Any]]]:
+    domains: Dict[str, Dict[str, List[Any]]] = {}
+    for sql_query in sql_queries:
+        try:
+            expression = parse_one(sql_query, read="sqlite")
+        except Exception:
+            continue
+
+        aliases = {}
+        for table in expression.find_all(exp.Table):
+            name = sanitize_identifier(table.name)
+            if name in tables:
+                aliases[table.alias_or_name.lower()] = name
+
+        for literal in expression.find_all(exp.Literal):
+            column = _literal_column(literal)
+            if column is None: continue
+
+            name = sanitize_identifier(column.name)
+            owner = aliases.get(column.table.lower()) if column.table else None
+            if owner:
+                owners = [owner]
+            else:
+                owners = [t for t in dict.fromkeys(aliases.values()) if tables[t].column(name)]
+                owners = owners or [t for t, spec in tables.items() if spec.column(name)]
+
+            pattern = isinstance(literal.parent, exp.Like)
+            for owner in owners:
+                if not tables[owner].column(name): continue
+                values = domains.setdefault(owner, {}).setdefault(name, [])
+                for value in _variants(_literal_value(literal), pattern):
+                    if value not in values:
+                        values.append(value)
+    return domains
+
+def _same_result(a: Dict[str, Any], b: Dict[str, Any], ordered: bool) -> bool:
+    key = "ordered" if ordered else "multiset"
+    return a["rows"] == b["rows"] and a[key] == b[key]
+
+class Distinguisher:
+    def __init__(self, cache_dir: str, rows: int = 4, candidates: int = 30, spreads: Tuple = (None, 200),
+                 max_steps: Optional[int] = 1_000_000, timeout: Optional[float] = 1.0):
+        self.rows = rows
+        self.generators = {spread: DataGenerator(cache_dir, rows=rows, spread=spread) for spread in spreads}
+        self.spreads = list(spreads)
+        self.candidates = candidates
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self._graders: Dict[str, ExecutionGrader] = {}
+
+    def _grader(self, db_dir: str) -> ExecutionGrader:
+        grader = self._graders.get(db_dir)
+        if grader is None:
+            grader = self._graders[db_dir] = ExecutionGrader(
+                db_dir, max_steps=self.max_steps, timeout=self.timeout, max_rows=10_000, step_log_size=0
+            )
+        return grader
+
+    def _probe(self, grader: ExecutionGrader, db_id: str, gt_sqls: List[str],
+               incorrect: List[str]) -> Optional[Tuple[bool, List[int]]]:
+        golds = []
+        for gt_sql in gt_sqls:
+            status, gold = grader.gold_fingerprint(gt_sql, db_id)
+            if status == "success":
+                golds.append(gold)
+            elif status != "error":
+                return None
+
+        if not golds:
+            return None
+
+        reference = golds[0]
+        ordered = all(gold["ordered"] for gold in golds)
+        agree = all(_same_result(gold["result"], reference["result"], ordered) for gold in golds[1:])
+
+        killed = []
+        for idx, sql_query in enumerate(incorrect):
+            status, result = grader.execute(sql_query, db_id)
+            if status != "success" or not any(_same_result(result, gold["result"], gold["ordered"]) for gold in golds):
+                killed.append(idx)
+        return agree, killed
+
+    def search(self, schema: Dict[str, Any], gt_sqls: List[str], incorrect: List[str]) -> Dict[str, Any]:
+        tables = compile_specs(schema)
+        domains = harvest_domains(gt_sqls + incorrect, tables)
+
+        agreeing: Dict[int, set] = {}
+        fallback: Dict[int, set] = {}
+        covered = set()
+        for seed in range(self.candidates):
+            spread = self.spreads[seed % len(self.spreads)]
+            db_dir, (db_id,) = self.generators[spread].generate(schema, seeds=[seed], domains=domains)
+            probe = self._probe(self._grader(db_dir), db_id, gt_sqls, incorrect)
+            if probe is None: continue
+
+            agree, killed = probe
+            if not agree:
+                fallback[seed] = set(killed)
+                continue
+
+            agreeing[seed] = set(killed)
+            covered |= agreeing[seed]
+            if len(covered) == len(incorrect):
+                break
+
+        coverage = agreeing or fallback
+        covered = set().union(*coverage.values()) if coverage else set()
+
+        chosen = []
+        remaining = set(covered)
+        while remaining:
+            seed = max(coverage, key=lambda s: (len(coverage[s] & remaining), -s))
+            chosen.append(seed)
+            remaining -= coverage[seed]
+
+        if not chosen and coverage:
+            chosen.append(min(coverage))
+
+        return {
+            "rows": self.rows,
+            "instances": [{"seed": seed, "spread": self.spreads[seed % len(self.spreads)]} for seed in chosen],
+            "domains": domains,
+            "gt_agreement": bool(agreeing),
+            "valid_candidates": len(coverage),
+            "killed": sorted(covered),
+            "unkilled": [idx for idx in range(len(incorrect)) if idx not in covered]
+        }
+
+    def instances(self, schema: Dict[str, Any], distinguishing: Dict[str, Any]) -> List[Tuple[str, str]]:
+        generated = []
+        for instance in distinguishing["instances"]:
+            generator = self.generators.get(instance["spread"])
+            if generator is None or generator.rows != distinguishing["rows"]:
+                generator = DataGenerator(self.generators[self.spreads[0]].cache_dir, rows=distinguishing["rows"], spread=instance["spread"])
+            db_dir, (db_id,) = generator.generate(schema, seeds=[instance["seed"]], domains=distinguishing["domains"] or None)
+            generated.append((db_dir, db_id))
+        return generated
+
+    def evaluate(self, student_sql: str, gt_sqls: List[str], schema: Dict[str, Any],
+                 distinguishing: Dict[str, Any]) -> Dict[str, Any]:
+        instances = self.instances(schema, distinguishing)
+
+        result = {"execution_match": bool(instances), "matched_gt": None, "execution_error": None,
+                  "instances": len(instances), "failed_instance": None}
+        for db_dir, db_id in instances:
+            outcome = self._grader(db_dir).evaluate(student_sql, gt_sqls, db_id)
+            if not outcome["execution_match"]:
+                result.update(execution_match=False, matched_gt=None, failed_instance=db_id,
+                              execution_error=outcome["execution_error"])
+                break
+            result["matched_gt"] = result["matched_gt"] or outcome["matched_gt"]
+        return result
+
+def annotate_dataset(questions: List[Dict[str, Any]], schemas: Dict[str, Dict[str, Any]], distinguisher: Distinguisher,
+                     output_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    annotated = []
+    for question in questions:
+        queries = question["queries"]
+        schema = schemas.get(question["db_id"])
+        entry = dict(question)
+        if schema:
+            entry["distinguishing_set"] = distinguisher.search(
+                schema, queries["correct_queries"], [q["query"] for q in queries["incorrect_queries"]]
+            )
+        annotated.append(entry)
+
+    if output_path:
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(annotated, f, indent=2)
+        os.replace(tmp_path, output_path)
+    return annotated
@@ -0,0 +1,143 @@
+import re
+from sqlglot import exp, parse_one
+from typing import List, Dict, Any, Optional, Set, Tuple
+from .db_pool import ConnectionPool
+from .execution_grader import execute_guarded
+
+_FULL_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS (\w+))?$")
+
+class EfficiencyAnalyzer:
+    def __init__(self, pool: ConnectionPool, threshold: float = 2.0, deduction: float = 0.1,
+                 max_steps: Optional[int] = 50_000_000, timeout: Optional[float] = 5.0, interval: int = 100):
+        self.pool = pool
+        self.threshold = threshold
+        self.deduction = deduction
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.interval = interval
+        self._gold_profiles: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._columns: Dict[Tuple[str, str], Set[str]] = {}
+
+    def profile(self, sql_query: str, db_id: str) -> Dict[str, Any]:
+        with self.pool.checkout(db_id) as conn:
+            try:
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql_query}").fetchall()]
+            except Exception as e:
+                return {"status": "error", "error": f"Error: {str(e)}"}
+
+            status, payload, budget = execute_guarded(
+                conn, sql_query,
+                max_steps=self.max_steps,
+                timeout=self.timeout,
+                interval=self.interval
+            )
+
+            full_scans = []
+            for detail in plan:
+                match = _FULL_SCAN_RE.match(detail)
+                if match:
+                    full_scans.append(match.group(1))
+
+            return {
+                "status": status,
+                "steps": budget.steps,
+                "plan": plan,
+                "full_table_scans": len(full_scans),
+                "correlated_subqueries": sum(1 for detail in plan if detail.startswith("CORRELATED")),
+                "index_hints": self._index_hints(conn, sql_query, db_id, full_scans)
+            }
+
+    def _table_columns(self, conn, db_id: str, table: str) -> Set[str]:
+        key = (db_id, table.lower())
+        columns = self._columns.get(key)
+        if columns is None:
+            try:
+                cursor = conn.execute(f'SELECT * FROM "{table}" LIMIT 0')
+                columns = {d[0].lower() for d in cursor.description}
+            except Exception:
+                columns = set()
+            self._columns[key] = columns
+        return columns
+
+    def _index_hints(self, conn, sql_query: str, db_id: str, full_scans: List[str]) -> List[str]:
+        if not full_scans:
+            return []
+
+        try:
+            expression = parse_one(sql_query, read="sqlite")
+        except Exception:
+            return []
+
+        aliases = {}
+        for table in expression.find_all(exp.Table):
+            aliases[table.alias_or_name.lower()] = (table.name.lower(), table.find_ancestor(exp.Select))
+
+        predicates = list(expression.find_all(exp.Where))
+        predicates += [join.args["on"] for join in expression.find_all(exp.Join) if join.args.get("on")]
+
+        hints = []
+        for alias in dict.fromkeys(a.lower() for a in full_scans):
+            table, scope = aliases.get(alias, (alias, None))
+            table_columns = self._table_columns(conn, db_id, table)
+
+            filtered = []
+            for predicate in predicates:
+                for column in predicate.find_all(exp.Column):
+                    name = column.name.lower()
+                    owner = column.table.lower()
+                    if owner not in (alias, "") or name not in table_columns or name in filtered:
+                        continue
+                    clause = column.find_ancestor(exp.Where, exp.Join, exp.Select)
+                    if isinstance(clause, (exp.Where, exp.Join)) and clause.find_ancestor(exp.Select) is scope:
+                        filtered.append(name)
+
+            if filtered:
+                hints.append(f"Consider an index on {table}({', '.join(filtered)})")
+        return hints
+
+    def gold_profile(self, gt_sql: str, db_id: str) -> Dict[str, Any]:
+        key = (db_id, gt_sql)
+        profile = self._gold_profiles.get(key)
+        if profile is None:
+            profile = self._gold_profiles[key] = self.profile(gt_sql, db_id)
+        return profile
+
+    def analyze(self, student_sql: str, gt_sql: str, db_id: str) -> Dict[str, Any]:
+        student = self.profile(student_sql, db_id)
+        gold = self.gold_profile(gt_sql, db_id)
+
+        if student["status"] != "success" or gold["status"] != "success":
+            return {
+                "status": "unavailable",
+                "student": student,
+                "gold": gold,
+                "cost_ratio": None,
+                "deduction": 0.0
+            }
+
+        cost_ratio = student["steps"] / max(gold["steps"], self.interval)
+        deduction = self.deduction if cost_ratio > self.threshold else 0.0
+
+        return {
+            "status": "success",
+            "student": student,
+            "gold": gold,
+            "cost_ratio": round(cost_ratio, 2),
+            "full_table_scans": student["full_table_scans"],
+            "index_hints": student["index_hints"],
+            "deduction": deduction
+        }
+
+    def attach(self, result: Dict[str, Any], student_sql: str, db_id: str) -> Dict[str, Any]:
+        if not result or "error" in result or not result.get("matched_gt"):
+            return result
+
+        report = self.analyze(student_sql, result["matched_gt"], db_id)
+        deducted_marks = round(report["deduction"] * result["total_marks"], 2)
+        report["deducted_marks"] = deducted_marks
+        report["adjusted_percentage"] = round(
+            max(0.0, result["obtained_marks"] - deducted_marks) / result["total_marks"] * 100, 2
+        ) if result["total_marks"] else 0.0
+
+        result["efficiency"] = report
+        return result
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from sqlglot import exp, parse_one
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+from .db_pool import ConnectionPool
+from .metrics import REGISTRY
+
+MASK_64 = (1 << 64) - 1
+RESOURCE_LIMIT_EXCEEDED = "resource_limit_exceeded"
+
+EXECUTIONS = REGISTRY.counter("assessql_executions_total", "Queries executed against SQLite by status.", ("status",))
+EXECUTION_LIMITS = REGISTRY.counter("assessql_execution_limits_exceeded_total", "Executions stopped by a resource limit by reason (timeout, steps, rows).", ("reason",))
+EXECUTION_SECONDS = REGISTRY.histogram("assessql_execution_seconds", "Wall time of guarded query execution.")
+
+class StepBudget:
+    def __init__(self, max_steps: Optional[int], timeout: Optional[float], interval: int = 1000):
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.interval = interval
+        self.steps = 0
+        self.exceeded = None
+        self.started = time.monotonic()
+        self.deadline = (self.started + timeout) if timeout else None
+
+    def __call__(self) -> int:
+        self.steps += self.interval
+        if self.max_steps is not None and self.steps > self.max_steps:
+            self.exceeded = "steps"
+            return 1
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.exceeded = "timeout"
+            return 1
+        return 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def row_digest(row: Tuple) -> bytes:
+    payload = repr(tuple(_normalize_value(v) for v in row)).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=8).digest()
+
+class ResultFingerprint:
+    def __init__(self):
+        self._ordered = hashlib.blake2b(digest_size=16)
+        self._multiset = 0
+        self.count = 0
+        self.truncated = False
+
+    def update(self, rows: Iterable[Tuple]):
+        for row in rows:
+            digest = row_digest(row)
+            self._ordered.update(digest)
+            self._multiset = (self._multiset + int.from_bytes(digest, "big")) & MASK_64
+            self.count += 1
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "rows": self.count,
+            "ordered": self._ordered.hexdigest(),
+            "multiset": f"{self._multiset:016x}",
+            "truncated": self.truncated
+        }
+
+def fingerprint_rows(rows: Iterable[Tuple]) -> Dict[str, Any]:
+    fingerprint = ResultFingerprint()
+    fingerprint.update(rows)
+    return fingerprint.result()
+
+def execute_guarded(conn: sqlite3.Connection, sql_query: str, max_steps: Optional[int] = None,
+                    timeout: Optional[float] = None, max_rows: Optional[int] = None,
+                    stop_after: Optional[int] = None, chunk_size: int = 1000,
+                    interval: int = 1000) -> Tuple[str, Any, StepBudget]:
+    budget = StepBudget(max_steps, timeout, interval)
+    fingerprint = ResultFingerprint()
+    conn.set_progress_handler(budget, interval)
+    try:
+        cursor = conn.execute(sql_query)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+
+                fingerprint.update(rows)
+
+                if max_rows is not None and fingerprint.count > max_rows:
+                    budget.exceeded = "rows"
+                    return RESOURCE_LIMIT_EXCEEDED, budget.exceeded, budget
+
+                if stop_after is not None and fingerprint.count > stop_after:
+                    fingerprint.truncated = True
+                    break
+        finally:
+            cursor.close()
+
+        return "success", fingerprint.result(), budget
+
+    except sqlite3.OperationalError as e:
+        if budget.exceeded:
+            return RESOURCE_LIMIT_EXCEEDED, budget.exceeded, budget
+        return "error", f"Error: {str(e)}", budget
+    finally:
+        conn.set_progress_handler(None, 0)
+
+def is_order_sensitive(sql_query: str) -> bool:
+    try:
+        expression = parse_one(sql_query, read="sqlite").unnest()
+    except Exception:
+        return False
+    return isinstance(expression, exp.Query) and bool(expression.args.get("order"))
+
+class ExecutionGrader:
+    def __init__(self, db_dir: str, cache_path: Optional[str] = None, pool: Optional[ConnectionPool] = None,
+                 max_steps: Optional[int] = 50_000_000, timeout: Optional[float] = 5.0,
+                 max_rows: Optional[int] = 100_000, step_log_size: int = 10_000):
+        self.db_dir = db_dir
+        self.pool = pool or ConnectionPool(db_dir)
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_rows = max_rows
+        self.step_log = deque(maxlen=step_log_size)
+        self.cache_path = cache_path
+        self.gold_cache: Dict[str, Dict[str, Any]] = {}
+        self._checksums: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._dirty = False
+
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                self.gold_cache = json.load(f)
+
+    def db_path(self, db_id: str) -> str:
+        return self.pool.db_path(db_id)
+
+    def db_checksum(self, db_id: str) -> str:
+        path = self.db_path(db_id)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        cached = self._checksums.get(db_id)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+
+        checksum = h.hexdigest()
+        self._checksums[db_id] = (signature, checksum)
+        return checksum
+
+    def execute(self, sql_query: str, db_id: str, stop_after: Optional[int] = None) -> Tuple[str, Any]:
+        try:
+            with self.pool.checkout(db_id) as conn:
+                status, payload, budget = execute_guarded(
+                    conn, sql_query,
+                    max_steps=self.max_steps,
+                    timeout=self.timeout,
+                    max_rows=self.max_rows,
+                    stop_after=stop_after
+                )
+        except Exception as e:
+            EXECUTIONS.inc("error")
+            return "error", f"Error: {str(e)}"
+
+        EXECUTIONS.inc(status)
+        EXECUTION_SECONDS.observe(budget.elapsed)
+        if status == RESOURCE_LIMIT_EXCEEDED:
+            EXECUTION_LIMITS.inc(payload)
+
+        self.step_log.append({
+            "db_id": db_id,
+            "sql": sql_query,
+            "status": status,
+            "steps": budget.steps,
+            "elapsed": budget.elapsed
+        })
+
+        if status == "success":
+            payload["steps"] = budget.steps
+            return status, payload
+
+        if status == RESOURCE_LIMIT_EXCEEDED:
+            return status, {"reason": payload, "steps": budget.steps, "elapsed": round(budget.elapsed, 4)}
+
+        return status, payload
+
+    def gold_fingerprint(self, gt_sql: str, db_id: str) -> Tuple[str, Any]:
+        checksum = self.db_checksum(db_id)
+        entry = self.gold_cache.get(db_id)
+        if not entry or entry.get("checksum") != checksum:
+            if entry:
+                self.pool.invalidate(db_id)
+            entry = self.gold_cache[db_id] = {"checksum": checksum, "gold": {}}
+            self._dirty = True
+
+        gold = entry["gold"].get(gt_sql)
+        if gold is None or gold["status"] == RESOURCE_LIMIT_EXCEEDED:
+            status, result = self.execute(gt_sql, db_id)
+            gold = {
+                "status": status,
+                "result": result,
+                "ordered": is_order_sensitive(gt_sql)
+            }
+            if status == RESOURCE_LIMIT_EXCEEDED:
+                if entry["gold"].pop(gt_sql, None) is not None:
+                    self._dirty = True
+            else:
+                entry["gold"][gt_sql] = gold
+                self._dirty = True
+
+        return gold["status"], gold
+
+    def evaluate(self, student_sql: str, gt_sqls: List[str], db_id: str) -> Dict[str, Any]:
+        golds = []
+        for gt_sql in gt_sqls:
+            status, gold = self.gold_fingerprint(gt_sql, db_id)
+            if status == "success":
+                golds.append((gt_sql, gold))
+
+        stop_after = max((gold["result"]["rows"] for _, gold in golds), default=0)
+        status, student = self.execute(student_sql, db_id, stop_after=stop_after)
+        if status == RESOURCE_LIMIT_EXCEEDED:
+            return {
+                "execution_match": False,
+                "matched_gt": None,
+                "execution_error": f"Resource limit exceeded ({student['reason']}).",
+                "resource_limit": student,
+                "row_count": 0,
+                "steps": student["steps"]
+            }
+
+        if status != "success":
+            return {
+                "execution_match": False,
+                "matched_gt": None,
+                "execution_error": student,
+                "row_count": 0,
+                "steps": 0
+            }
+
+        matched_gt = None
+        for gt_sql, gold in golds:
+            key = "ordered" if gold["ordered"] else "multiset"
+            if student["rows"] == gold["result"]["rows"] and student[key] == gold["result"][key]:
+                matched_gt = gt_sql
+                break
+
+        return {
+            "execution_match": matched_gt is not None,
+            "matched_gt": matched_gt,
+            "execution_error": None,
+            "row_count": student["rows"],
+            "row_count_truncated": student["truncated"],
+            "steps": student["steps"]
+        }
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.gold_cache, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
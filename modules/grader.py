@@ -1,80 +1,421 @@
+import copy
+import functools
+import hashlib
+import time
 from sqlglot import exp
-from sqlglot.optimizer.simplify import simplify
-from typing import List, Dict, Any, Set
+from collections import defaultdict, deque
+from heapq import merge
+from sqlglot.optimizer.simplify import Simplifier, _is_constant
+from typing import List, Dict, Any, Set, Tuple, Optional, Union
 from .sql_processor import SQLProcessor
+from .instrumentation import Instrumentation
+from .metrics import REGISTRY, Histogram
+
+FeatureVector = Tuple[int, List[str]]
+
+GRADER_VERSION = 2
+
+GRADED = REGISTRY.counter("assessql_submissions_graded_total", "Submissions graded by outcome.", ("outcome",))
+EXACT_MATCHES = REGISTRY.counter("assessql_exact_match_lookups_total", "Canonical exact-match lookups by question and result.", ("question", "result"))
+QUESTION_LATENCY = REGISTRY.histogram("assessql_question_latency_seconds", "Grading latency per submission by question.", ("question",))
+BATCH_LATENCY = REGISTRY.histogram("assessql_batch_latency_seconds", "Wall time per batch or clustered grading call by question.", ("question",))
+
+def question_label(gt_sqls: List[str]) -> str:
+    return hashlib.sha1("\0".join(gt_sqls).encode("utf-8")).hexdigest()[:10]
+
+def score_ratio(matches: int, missing: int, extras: int) -> Tuple[float, float]:
+    total = matches + missing
+
+    penalty = extras * 0.5
+    obtained = max(0.0, matches - penalty)
+
+    ratio = (obtained / total) if total > 0 else 0.0
+    return obtained, ratio
+
+_FAILED = "Grading failed"
+
+def exact_match_hit_rate() -> float:
+    totals = {"hit": 0, "miss": 0}
+    for (_, result), value in list(EXACT_MATCHES.values.items()):
+        totals[result] += value
+    lookups = totals["hit"] + totals["miss"]
+    return (totals["hit"] / lookups) if lookups else 0.0
+
+def failed_result(error: BaseException) -> Dict[str, Any]:
+    return {"error": f"{_FAILED}: {type(error).__name__}: {error}"}
+
+def is_failed(result: Dict[str, Any]) -> bool:
+    return str(result.get("error", "")).startswith(_FAILED)
+
+def _outcome(result: Optional[Dict[str, Any]]) -> str:
+    if result is None or "error" in result:
+        return "error"
+    return "correct" if result["percentage"] == 100.0 else "partial"
+
+class CompiledQuestion:
+    label: Optional[str] = None
+
+    def __init__(self, gt_sqls: List[str], ground_truths: List[Tuple[str, Set[str]]], canonical_sqls: Optional[List[str]] = None):
+        self.gt_sqls = gt_sqls
+        self.ground_truths = ground_truths
+        self.label = question_label(gt_sqls)
+
+        self.vocabulary: Dict[str, int] = {}
+        self.features: List[str] = []
+        self.gt_vectors = [self._intern(gt_features) for _, gt_features in ground_truths]
+
+        self.canonical_index: Dict[str, int] = {}
+        for idx, canonical in enumerate(canonical_sqls or []):
+            if not self.gt_vectors[idx]: continue
+            first = self.gt_vectors.index(self.gt_vectors[idx])
+            self.canonical_index.setdefault(canonical, first)
+
+        self.lookups = 0
+        self.exact_hits = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.exact_hits / self.lookups) if self.lookups else 0.0
+
+    def lookup(self, canonical_sql: str) -> Optional[int]:
+        self.lookups += 1
+        idx = self.canonical_index.get(canonical_sql)
+        if idx is not None:
+            self.exact_hits += 1
+        EXACT_MATCHES.inc(self.label or "unknown", "miss" if idx is None else "hit")
+        return idx
+
+    def _intern(self, features: Set[str]) -> int:
+        mask = 0
+        for feature in sorted(features):
+            feature_id = self.vocabulary.get(feature)
+            if feature_id is None:
+                feature_id = self.vocabulary[feature] = len(self.features)
+                self.features.append(feature)
+            mask |= 1 << feature_id
+        return mask
+
+    def encode(self, features: Set[str]) -> FeatureVector:
+        mask = 0
+        unknown = []
+        for feature in features:
+            feature_id = self.vocabulary.get(feature)
+            if feature_id is None:
+                unknown.append(feature)
+            else:
+                mask |= 1 << feature_id
+        return mask, sorted(unknown)
+
+    def decode(self, mask: int) -> List[str]:
+        features = []
+        while mask:
+            low = mask & -mask
+            features.append(self.features[low.bit_length() - 1])
+            mask ^= low
+        return features
+
+    def score_matrix(self, vectors: List[FeatureVector]) -> List[List[Tuple[int, int, int]]]:
+        rows = []
+        for mask, unknown in vectors:
+            rows.append([
+                ((mask & gt).bit_count(), (gt & ~mask).bit_count(), (mask & ~gt).bit_count() + len(unknown))
+                for gt in self.gt_vectors
+            ])
+        return rows
+
+    def score_one(self, vector: FeatureVector, idx: int) -> Tuple[int, int, int]:
+        mask, unknown = vector
+        gt = self.gt_vectors[idx]
+        return (mask & gt).bit_count(), (gt & ~mask).bit_count(), (mask & ~gt).bit_count() + len(unknown)
 
 class Grader:
-    def __init__(self, schema: Dict[str, Dict[str, str]]):
-        self.processor = SQLProcessor(schema)
+    def __init__(self, schema: Dict[str, Dict[str, str]], cache_size: int = 1024, in_place: bool = False,
+                 instrumentation: Optional[Instrumentation] = None):
+        self.instrumentation = instrumentation
+        self.processor = SQLProcessor(schema, cache_size=cache_size, in_place=in_place, instrumentation=instrumentation)
+
+    def compile(self, gt_sqls: List[str]) -> CompiledQuestion:
+        timer = self.instrumentation
+        if timer and timer.active:
+            return timer.isolated("compile_question", self._compile, gt_sqls)
+        return self._compile(gt_sqls)
+
+    def _compile(self, gt_sqls: List[str]) -> CompiledQuestion:
+        ground_truths = []
+        canonical_sqls = []
+        for gt_sql in gt_sqls:
+            analyzed = self.analyze(gt_sql)
+            if not analyzed: continue
+            ground_truths.append((gt_sql, analyzed[0]))
+            canonical_sqls.append(analyzed[1])
+
+        return CompiledQuestion(gt_sqls, ground_truths, canonical_sqls)
+
+    def analyze(self, sql: str) -> Optional[Tuple[Set[str], str]]:
+        ast = self._prepare(sql)
+        if not ast:
+            return None
+        return self._extract_features(ast), self.processor.get_canonical_sql(ast)
 
     def evaluate(self, student_sql: str, gt_sqls: List[str]) -> Dict[str, Any]:
-        student_ast = self.processor.parse_and_optimize(student_sql)
+        start = time.perf_counter()
+        timer = self.instrumentation
+        started = timer.begin() if timer else 0.0
+        student_ast = self._prepare(student_sql)
         
         if not student_ast:
-            return {
-                "gts" : gt_sqls,
-                "error": "Syntax Error or Invalid SQL Format.",
-                "obtained_marks": 0,
-                "total_marks": 0,
-                "percentage": 0.0
+            result = self._error_result(gt_sqls)
+        else:
+            result = self._evaluate_ast(student_ast, self.compile(gt_sqls))
+
+        if timer: self._attach_timings(result, timer.end(started))
+        self._record_metrics(question_label(gt_sqls), [result], time.perf_counter() - start)
+        return result
+
+    def evaluate_compiled(self, student_sql: str, question: CompiledQuestion) -> Dict[str, Any]:
+        start = time.perf_counter()
+        timer = self.instrumentation
+        started = timer.begin() if timer else 0.0
+        student_ast = self._prepare(student_sql)
+
+        if not student_ast:
+            result = self._error_result(question.gt_sqls)
+        else:
+            result = self._evaluate_ast(student_ast, question)
+
+        if timer: self._attach_timings(result, timer.end(started))
+        self._record_metrics(question.label, [result], time.perf_counter() - start)
+        return result
+
+    def evaluate_batch(self, submissions: List[str], gt_sqls: Union[List[str], CompiledQuestion]) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        question = gt_sqls if isinstance(gt_sqls, CompiledQuestion) else self.compile(gt_sqls)
+
+        timer = self.instrumentation
+        records = []
+        results = []
+        pending = []
+        for student_sql in submissions:
+            started = timer.begin() if timer else 0.0
+            student_ast = self._prepare(student_sql)
+            if not student_ast:
+                results.append(self._error_result(question.gt_sqls))
+            else:
+                exact = self._exact_result(student_ast, question)
+                if exact is not None:
+                    results.append(exact)
+                else:
+                    lap = time.perf_counter() if timer else 0.0
+                    features = self._extract_features(student_ast)
+                    if timer: timer.lap("extract_features", lap, features)
+                    results.append(None)
+                    pending.append((len(results) - 1, question.encode(features)))
+
+            if timer: records.append(timer.end(started))
+
+        lap = time.perf_counter() if timer else 0.0
+        rows = question.score_matrix([vector for _, vector in pending])
+        for (idx, vector), row in zip(pending, rows):
+            results[idx] = self._best_result(question, vector, row)
+
+        if timer:
+            timer.amortize("score", (time.perf_counter() - lap) * 1000, [records[idx] for idx, _ in pending])
+            for result, record in zip(results, records):
+                self._attach_timings(result, record)
+
+        self._record_metrics(question.label, results, time.perf_counter() - start, BATCH_LATENCY)
+        return results
+
+    def cluster(self, submissions: List[str]) -> Tuple[List[int], List[Dict[str, Any]]]:
+        assignment = []
+        clusters = []
+        by_text: Dict[str, int] = {}
+        by_canonical: Dict[Any, int] = {}
+
+        for idx, student_sql in enumerate(submissions):
+            text_key = self.processor.cache_key(student_sql)
+            cluster_id = by_text.get(text_key)
+            if cluster_id is None:
+                student_ast = self._prepare(student_sql)
+                canonical_sql = self.processor.get_canonical_sql(student_ast) if student_ast else None
+                group_key = canonical_sql if canonical_sql is not None else ("invalid", text_key)
+
+                cluster_id = by_canonical.get(group_key)
+                if cluster_id is None:
+                    cluster_id = by_canonical[group_key] = len(clusters)
+                    clusters.append({
+                        "cluster_id": cluster_id,
+                        "canonical_sql": canonical_sql,
+                        "representative": idx,
+                        "members": [],
+                        "ast": student_ast
+                    })
+                by_text[text_key] = cluster_id
+
+            clusters[cluster_id]["members"].append(idx)
+            assignment.append(cluster_id)
+
+        return assignment, clusters
+
+    def evaluate_clustered(self, submissions: List[str], gt_sqls: Union[List[str], CompiledQuestion]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        question = gt_sqls if isinstance(gt_sqls, CompiledQuestion) else self.compile(gt_sqls)
+        assignment, clusters = self.cluster(submissions)
+
+        graded = []
+        pending = []
+        for cluster in clusters:
+            student_ast = cluster.pop("ast")
+            if student_ast is None:
+                graded.append(self._error_result(question.gt_sqls))
+                continue
+
+            exact = self._exact_canonical(cluster["canonical_sql"], question)
+            if exact is not None:
+                graded.append(exact)
+                continue
+
+            graded.append(None)
+            pending.append((cluster["cluster_id"], question.encode(self._extract_features(student_ast))))
+
+        rows = question.score_matrix([vector for _, vector in pending])
+        for (cluster_id, vector), row in zip(pending, rows):
+            graded[cluster_id] = self._best_result(question, vector, row)
+
+        results = []
+        for cluster_id in assignment:
+            result = copy.deepcopy(graded[cluster_id])
+            result["cluster_id"] = cluster_id
+            results.append(result)
+
+        for cluster in clusters:
+            cluster["size"] = len(cluster["members"])
+            cluster["representative_sql"] = submissions[cluster["representative"]]
+            cluster["percentage"] = graded[cluster["cluster_id"]]["percentage"]
+
+        self._record_metrics(question.label, results, time.perf_counter() - start, BATCH_LATENCY)
+        return {
+            "results": results,
+            "clusters": sorted(clusters, key=lambda c: (-c["size"], c["cluster_id"])),
+            "distinct": len(clusters),
+            "submissions": len(submissions)
+        }
+
+    def _record_metrics(self, label: Optional[str], results: List[Optional[Dict[str, Any]]], elapsed: float,
+                        latency: Histogram = QUESTION_LATENCY):
+        if not results:
+            return
+        for result in results:
+            GRADED.inc(_outcome(result))
+        latency.observe(elapsed, label or "unknown")
+
+    def _attach_timings(self, result: Optional[Dict[str, Any]], record: Optional[Dict[str, Dict[str, float]]]):
+        if result is not None and record is not None:
+            result["timings"] = record
+
+    def _prepare(self, sql: str) -> Optional[exp.Expression]:
+        return self.processor.parse_normalized(sql, self._normalize_ast)
+
+    def _evaluate_ast(self, student_ast: exp.Expression, question: CompiledQuestion) -> Dict[str, Any]:
+        exact = self._exact_result(student_ast, question)
+        if exact is not None:
+            return exact
+
+        timer = self.instrumentation
+        lap = time.perf_counter() if timer else 0.0
+        features = self._extract_features(student_ast)
+        if timer: lap = timer.lap("extract_features", lap, features)
+        result = self._score(features, question)
+        if timer: timer.lap("score", lap)
+        return result
+
+    def _exact_result(self, student_ast: exp.Expression, question: CompiledQuestion) -> Optional[Dict[str, Any]]:
+        timer = self.instrumentation
+        lap = time.perf_counter() if timer else 0.0
+        result = self._exact_canonical(self.processor.get_canonical_sql(student_ast), question)
+        if timer: timer.lap("exact_match", lap)
+        return result
+
+    def _exact_canonical(self, canonical_sql: str, question: CompiledQuestion) -> Optional[Dict[str, Any]]:
+        idx = question.lookup(canonical_sql)
+        if idx is None:
+            return None
+
+        total = len(question.ground_truths[idx][1])
+        return {
+            "matched_gt": question.ground_truths[idx][0],
+            "obtained_marks": float(total),
+            "total_marks": total,
+            "percentage": 100.0,
+            "feedback": {
+                "missing": [],
+                "extras": []
             }
+        }
 
-        student_ast = self._normalize_ast(student_ast)
-        student_features = self._extract_features(student_ast)
-        
-        best_result = None
-        best_score_ratio = -1.0
+    def _no_ground_truth_result(self, gt_sqls: List[str]) -> Dict[str, Any]:
+        return dict(self._error_result(gt_sqls), error="Question has no valid ground truth.")
 
-        for gt_sql in gt_sqls:
-            gt_ast = self.processor.parse_and_optimize(gt_sql)
-            if not gt_ast: continue
+    def _error_result(self, gt_sqls: List[str]) -> Dict[str, Any]:
+        return {
+            "gts" : gt_sqls,
+            "error": "Syntax Error or Invalid SQL Format.",
+            "obtained_marks": 0,
+            "total_marks": 0,
+            "percentage": 0.0
+        }
 
-            gt_ast = self._normalize_ast(gt_ast)
-            gt_features = self._extract_features(gt_ast)
+    def _score(self, student_features: Set[str], question: CompiledQuestion) -> Dict[str, Any]:
+        vector = question.encode(student_features)
+        return self._best_result(question, vector, question.score_matrix([vector])[0])
 
-            matches = student_features.intersection(gt_features)
-            missing = gt_features - student_features
-            extras = student_features - gt_features
-            
-            obtained = len(matches)
-            total = len(gt_features)
+    def _best_result(self, question: CompiledQuestion, vector: FeatureVector, row: List[Tuple[int, int, int]]) -> Dict[str, Any]:
+        best_idx, best_score_ratio = self._pick_best(row)
+        if best_idx is None:
+            return self._no_ground_truth_result(question.gt_sqls)
 
-            penalty = len(extras) * 0.5
-            obtained = max(0.0, len(matches) - penalty)
-            
-            ratio = (obtained / total) if total > 0 else 0.0
-            
+        return self._scored_result(question, vector, best_idx, row[best_idx])
+
+    def _pick_best(self, row: List[Tuple[int, int, int]]) -> Tuple[Optional[int], float]:
+        best_idx = None
+        best_score_ratio = -1.0
+
+        for idx, (matches, missing, extras) in enumerate(row):
+            _, ratio = score_ratio(matches, missing, extras)
             if ratio > best_score_ratio:
+                best_idx = idx
                 best_score_ratio = ratio
-                best_result = {
-                    "matched_gt": gt_sql,
-                    "obtained_marks": obtained,
-                    "total_marks": total,
-                    "percentage": round(ratio * 100, 2),
-                    "feedback": {
-                        "missing": list(missing),
-                        "extras": list(extras)
-                    }
-                }
-
-        return best_result
+
+        return best_idx, best_score_ratio
+
+    def _scored_result(self, question: CompiledQuestion, vector: FeatureVector, idx: int,
+                       counts: Tuple[int, int, int]) -> Dict[str, Any]:
+        matches, missing, extras = counts
+        obtained, ratio = score_ratio(matches, missing, extras)
+        mask, unknown = vector
+        gt_mask = question.gt_vectors[idx]
+
+        return {
+            "matched_gt": question.ground_truths[idx][0],
+            "obtained_marks": obtained,
+            "total_marks": matches + missing,
+            "percentage": round(ratio * 100, 2),
+            "feedback": {
+                "missing": question.decode(gt_mask & ~mask),
+                "extras": question.decode(mask & ~gt_mask) + unknown
+            }
+        }
 
     def _normalize_ast(self, ast: exp.Expression) -> exp.Expression:
-        ast = simplify(ast)
-
-        def _standardize_commutative(node):
-            if isinstance(node, (exp.EQ, exp.NEQ, exp.Or, exp.Add, exp.Mul)):
-                left_str = node.left.sql()
-                right_str = node.right.sql()
-                if left_str > right_str:
-                    return node.__class__(this=node.right, expression=node.left)
-            return node
+        timer = self.instrumentation
+        lap = time.perf_counter() if timer else 0.0
+        ast = _ChainSimplifier().simplify(ast)
+        if timer: lap = timer.lap("simplify", lap, ast)
 
         def apply_equivalencies(node):
             if isinstance(node, exp.In) and not node.args.get("query"):
                 if len(node.expressions) == 1:
-                    new_node = exp.EQ(this=node.this, expression=node.expressions[0])
-                    return _standardize_commutative(new_node)
+                    return exp.EQ(this=node.this, expression=node.expressions[0])
             
             if isinstance(node, exp.Between):
                 return exp.And(
@@ -92,19 +433,69 @@ class Grader:
                     node.set("this", exp.Star())
                     return node
 
-            return _standardize_commutative(node)
+            return node
+
+        ast = ast.transform(apply_equivalencies, copy=not self.processor.in_place)
+        if timer: lap = timer.lap("equivalences", lap, ast)
+        ast = self._standardize_commutative(ast)
+        if timer: timer.lap("commutative", lap, ast)
+        return ast
+
+    def _standardize_commutative(self, ast: exp.Expression) -> exp.Expression:
+        digests = {}
+
+        def flatten(node, connector):
+            stack, operands = [node], []
+            while stack:
+                node = stack.pop()
+                if type(node) is connector:
+                    stack.append(node.expression)
+                    stack.append(node.this)
+                else:
+                    operands.append(node)
+            return operands
+
+        for node in reversed(list(ast.dfs())):
+            if id(node) in digests:
+                continue
+
+            if isinstance(node, _CHAIN_TYPES):
+                if type(node.parent) is type(node):
+                    continue
+
+                operands = sorted(flatten(node, type(node)), key=lambda operand: digests[id(operand)])
+                chain = operands[0]
+                for operand in operands[1:]:
+                    chain = node.__class__(this=chain, expression=operand)
+
+                if node is ast:
+                    ast = chain
+                else:
+                    node.replace(chain)
 
-        return ast.transform(apply_equivalencies)
+                digests[id(chain)] = _structural_digest(node.key, [digests[id(operand)] for operand in operands])
+                continue
+
+            if isinstance(node, _COMMUTATIVE_TYPES):
+                left, right = node.left, node.right
+                if digests[id(left)] > digests[id(right)]:
+                    node.set("this", right)
+                    node.set("expression", left)
+
+            digests[id(node)] = _node_digest(node, digests)
+
+        return ast
 
     def _extract_features(self, ast: exp.Expression) -> Set[str]:
         features = set()
+        rendered = {}
 
-        for table in ast.find_all(exp.Table):
-            features.add(f"TABLE:{table.name}")
-
-        for select in ast.find_all(exp.Select):
-            for expression in select.expressions:
-                features.add(f"SELECT:{expression.sql()}")
+        def sql(node):
+            key = id(node)
+            text = rendered.get(key)
+            if text is None:
+                text = rendered[key] = node.sql(copy=False)
+            return text
 
         def get_conditions(node):
             if isinstance(node, exp.And):
@@ -113,43 +504,177 @@ class Grader:
             else:
                 yield node
 
-        for where in ast.find_all(exp.Where):
-            for condition in get_conditions(where.this):
-                features.add(f"FILTER:{condition.sql()}")
-
-        for join in ast.find_all(exp.Join):
-            if join.args.get("on"):
-                side = join.args.get("side") 
-                prefix = "OUTER_JOIN_FILTER" if side else "FILTER"
-                
-                for condition in get_conditions(join.args.get("on")):
-                    features.add(f"{prefix}:{condition.sql()}")
-
-        for having in ast.find_all(exp.Having):
-            for condition in get_conditions(having.this):
-                features.add(f"HAVING:{condition.sql()}")
-
-        for group in ast.find_all(exp.Group):
-            for g in group.expressions:
-                features.add(f"GROUP:{g.sql()}")
-
-        for order in ast.find_all(exp.Order):
-            for o in order.expressions:
-                features.add(f"ORDER:{o.sql()}")
-
-        for limit in ast.find_all(exp.Limit):
-            if limit.expression:
-                features.add(f"LIMIT:{limit.expression.sql()}")
-        
-        for col_def in ast.find_all(exp.ColumnDef):
-            col_name = col_def.name
-            data_type = col_def.args.get("kind").sql() if col_def.args.get("kind") else "UNKNOWN"
-            features.add(f"COL_DEF:{col_name} TYPE:{data_type}")
-            
-            for constraint in col_def.find_all(exp.ColumnConstraint):
-                features.add(f"CONSTRAINT:{col_name}->{constraint.sql()}")
-                
-        for constraint in ast.find_all(exp.Constraint):
-            features.add(f"TABLE_CONSTRAINT:{constraint.sql()}")
+        for node in ast.walk():
+            kind = _feature_kind(node.__class__)
+            if kind is None:
+                continue
+
+            if kind is exp.Table:
+                features.add(f"TABLE:{node.name}")
+
+            elif kind is exp.Select:
+                for expression in node.expressions:
+                    features.add(f"SELECT:{sql(expression)}")
+
+            elif kind is exp.Where:
+                for condition in get_conditions(node.this):
+                    features.add(f"FILTER:{sql(condition)}")
+
+            elif kind is exp.Join:
+                if node.args.get("on"):
+                    side = node.args.get("side") 
+                    prefix = "OUTER_JOIN_FILTER" if side else "FILTER"
+                    
+                    for condition in get_conditions(node.args.get("on")):
+                        features.add(f"{prefix}:{sql(condition)}")
+
+            elif kind is exp.Having:
+                for condition in get_conditions(node.this):
+                    features.add(f"HAVING:{sql(condition)}")
+
+            elif kind is exp.Group:
+                for g in node.expressions:
+                    features.add(f"GROUP:{sql(g)}")
+
+            elif kind is exp.Order:
+                for o in node.expressions:
+                    features.add(f"ORDER:{sql(o)}")
+
+            elif kind is exp.Limit:
+                if node.expression:
+                    features.add(f"LIMIT:{sql(node.expression)}")
+
+            elif kind is exp.ColumnDef:
+                col_name = node.name
+                data_type = sql(node.args.get("kind")) if node.args.get("kind") else "UNKNOWN"
+                features.add(f"COL_DEF:{col_name} TYPE:{data_type}")
+
+            elif kind is exp.ColumnConstraint:
+                parent = node.parent
+                while parent is not None:
+                    if isinstance(parent, exp.ColumnDef):
+                        features.add(f"CONSTRAINT:{parent.name}->{sql(node)}")
+                    parent = parent.parent
+
+            elif kind is exp.Constraint:
+                features.add(f"TABLE_CONSTRAINT:{sql(node)}")
+
+        return features
+
+_CHAIN_TYPES = (exp.And, exp.Or)
+_SIDES = {exp.LT: "lt", exp.LTE: "lt", exp.GT: "gt", exp.GTE: "gt", exp.EQ: "eq", exp.NEQ: "neq"}
+_PARTNERS = {
+    exp.Or: {"lt": ("lt",), "gt": ("gt",)},
+    exp.And: {"lt": ("lt", "gt", "eq"), "gt": ("lt", "gt", "eq"), "eq": ("lt", "gt", "neq"), "neq": ("eq",)}
+}
+_COMMUTATIVE_TYPES = (exp.EQ, exp.NEQ, exp.Add, exp.Mul)
+
+class _ChainSimplifier(Simplifier):
+    # sqlglot's connector pass tries every operand of an AND/OR chain against every later one.
+    # Its rules only fire for constants and for comparisons sharing a column, so only those
+    # pairs are tried here, in the same queue order, which keeps the output identical.
+    def _flat_simplify(self, expression, simplifier, root=True):
+        partners = _PARTNERS.get(type(expression))
+        if partners is None or simplifier == self._simplify_binary or not (root or not expression.same_parent):
+            return super()._flat_simplify(expression, simplifier, root)
+
+        queue = deque()
+        constants = deque()
+        buckets = defaultdict(deque)
+        positions = [0, -1]
+
+        def keys(node):
+            side = _SIDES.get(type(node))
+            if side is None:
+                return side, []
+            return side, [arg for arg in node.args.values() if isinstance(arg, exp.Expression) and not _is_constant(arg)]
+
+        def push(node, front):
+            if front:
+                entry = [positions[1], node, True]
+                positions[1] -= 1
+            else:
+                entry = [positions[0], node, True]
+                positions[0] += 1
+            side, args = keys(node)
+            targets = [queue, constants] if isinstance(node, _CONSTANT_OPERANDS) else [queue]
+            targets += [buckets[(side, arg)] for arg in args]
+            for target in targets:
+                target.appendleft(entry) if front else target.append(entry)
+
+        def candidates(node):
+            if isinstance(node, _CONSTANT_OPERANDS):
+                return iter(queue)
+            side, args = keys(node)
+            sources = [constants] + [buckets[(other, arg)] for other in partners.get(side, ()) for arg in args]
+            for source in sources:
+                while source and not source[0][2]:
+                    source.popleft()
+            return merge(*sources, key=lambda entry: entry[0])
+
+        for operand in expression.flatten(unnest=False):
+            push(operand, False)
+        size = len(queue)
+
+        operands = []
+        while queue:
+            entry = queue.popleft()
+            if not entry[2]:
+                continue
+            entry[2] = False
+            a = entry[1]
+
+            seen = set()
+            for candidate in candidates(a):
+                if not candidate[2] or id(candidate) in seen:
+                    continue
+                seen.add(id(candidate))
+                result = simplifier(expression, a, candidate[1])
+                if result and result is not expression:
+                    candidate[2] = False
+                    push(result, True)
+                    break
+            else:
+                operands.append(a)
+
+        if len(operands) < size:
+            return functools.reduce(lambda a, b: expression.__class__(this=a, expression=b), operands)
+        return expression
+
+_CONSTANT_OPERANDS = (exp.Boolean, exp.Null, exp.Literal)
+
+def _structural_digest(key: str, parts: List[bytes]) -> bytes:
+    h = hashlib.blake2b(key.encode("utf-8"), digest_size=8)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+def _node_digest(node: exp.Expression, digests: Dict[int, bytes]) -> bytes:
+    parts = []
+    for arg_key in node.arg_types:
+        value = node.args.get(arg_key)
+        if value is None or value is False or value == []:
+            continue
+
+        parts.append(arg_key.encode("utf-8") + b"\x00")
+        for item in (value if isinstance(value, list) else [value]):
+            if isinstance(item, exp.Expression):
+                parts.append(digests[id(item)])
+            else:
+                parts.append(repr(item).encode("utf-8") + b"\x00")
+
+    return _structural_digest(node.key, parts)
+
+_FEATURE_TYPES = (
+    exp.Table, exp.Select, exp.Where, exp.Join, exp.Having, exp.Group, exp.Order,
+    exp.Limit, exp.ColumnDef, exp.ColumnConstraint, exp.Constraint
+)
+_FEATURE_KINDS = {}
 
-        return features
\ No newline at end of file
+def _feature_kind(node_type: type) -> Optional[type]:
+    try:
+        return _FEATURE_KINDS[node_type]
+    except KeyError:
+        kind = next((t for t in node_type.__mro__ if t in _FEATURE_TYPES), None)
+        _FEATURE_KINDS[node_type] = kind
+        return kind
@@ -0,0 +1,142 @@
+import time
+from typing import Dict, Any, Optional, Callable, List
+
+STAGE_ORDER = (
+    "cache_hit", "cache_miss", "tokenize", "parse", "normalize_casing", "qualify", "standardize_aliases", "rejected",
+    "simplify", "equivalences", "commutative", "cache_store", "compile_question", "exact_match", "extract_features", "score"
+)
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[idx]
+
+def count_nodes(output: Any) -> int:
+    if hasattr(output, "walk"):
+        return sum(1 for _ in output.walk())
+    return len(output)
+
+class TimingSummary:
+    def __init__(self):
+        self.runs = 0
+        self.total_ms = 0.0
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def add(self, record: Dict[str, Dict[str, float]]):
+        self.runs += 1
+        for stage, entry in record.items():
+            if stage == "total":
+                self.total_ms += entry["ms"]
+            else:
+                self.add_stage(stage, entry["ms"], entry.get("calls", 1), entry.get("nodes"))
+
+    def add_stage(self, stage: str, ms: float, calls: int = 1, nodes: Optional[int] = None):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "nodes": 0, "counted": 0}
+        stats["calls"] += calls
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        if nodes is not None:
+            stats["nodes"] += nodes
+            stats["counted"] += 1
+
+    def merge(self, other: "TimingSummary"):
+        self.runs += other.runs
+        self.total_ms += other.total_ms
+        for stage, stats in other.stages.items():
+            mine = self.stages.setdefault(stage, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "nodes": 0, "counted": 0})
+            for key in ("calls", "total_ms", "nodes", "counted"):
+                mine[key] += stats[key]
+            mine["max_ms"] = max(mine["max_ms"], stats["max_ms"])
+
+    def as_dict(self) -> Dict[str, Any]:
+        order = {stage: idx for idx, stage in enumerate(STAGE_ORDER)}
+        stages = {}
+        for stage in sorted(self.stages, key=lambda s: (order.get(s, len(order)), s)):
+            stats = self.stages[stage]
+            stages[stage] = {
+                "calls": stats["calls"],
+                "total_ms": round(stats["total_ms"], 3),
+                "mean_ms": round(stats["total_ms"] / stats["calls"], 4) if stats["calls"] else 0.0,
+                "max_ms": round(stats["max_ms"], 4),
+                "share": round(stats["total_ms"] / self.total_ms * 100, 1) if self.total_ms else 0.0,
+                "mean_nodes": round(stats["nodes"] / stats["counted"], 1) if stats["counted"] else None
+            }
+        return {"runs": self.runs, "total_ms": round(self.total_ms, 3), "stages": stages}
+
+    def format(self) -> str:
+        summary = self.as_dict()
+        lines = [f"{'stage':<22}{'calls':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}{'share':>8}{'nodes':>8}"]
+        for stage, s in summary["stages"].items():
+            nodes = "" if s["mean_nodes"] is None else f"{s['mean_nodes']:.0f}"
+            lines.append(f"{stage:<22}{s['calls']:>8}{s['total_ms']:>12.1f}{s['mean_ms']:>10.3f}{s['max_ms']:>10.3f}{s['share']:>7.1f}%{nodes:>8}")
+        lines.append(f"{summary['runs']} runs, {summary['total_ms']:.1f}ms total")
+        return "\n".join(lines)
+
+class Instrumentation:
+    def __init__(self, nodes: bool = True):
+        self.nodes = nodes
+        self.record: Optional[Dict[str, Dict[str, float]]] = None
+        self.depth = 0
+        self.summary = TimingSummary()
+
+    @property
+    def active(self) -> bool:
+        return self.record is not None
+
+    def begin(self) -> float:
+        if self.depth == 0:
+            self.record = {}
+        self.depth += 1
+        return time.perf_counter()
+
+    def lap(self, stage: str, since: float, output: Any = None) -> float:
+        now = time.perf_counter()
+        record = self.record
+        if record is None:
+            return now
+
+        entry = record.get(stage)
+        if entry is None:
+            entry = record[stage] = {"ms": 0.0, "calls": 0}
+        entry["ms"] += (now - since) * 1000
+        entry["calls"] += 1
+        if output is not None and self.nodes:
+            entry["nodes"] = count_nodes(output)
+        return time.perf_counter()
+
+    def end(self, started: float) -> Optional[Dict[str, Dict[str, float]]]:
+        self.depth -= 1
+        record = self.record
+        if self.depth > 0 or record is None:
+            return record
+
+        for entry in record.values():
+            entry["ms"] = round(entry["ms"], 4)
+        record["total"] = {"ms": round((time.perf_counter() - started) * 1000, 4)}
+        self.summary.add(record)
+        self.record = None
+        return record
+
+    def isolated(self, stage: str, fn: Callable, *args) -> Any:
+        record, depth = self.record, self.depth
+        self.record, self.depth = None, 1
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.record, self.depth = record, depth
+            self.lap(stage, start)
+
+    def amortize(self, stage: str, ms: float, records: List[Dict[str, Dict[str, float]]]):
+        if not records:
+            return
+        share = ms / len(records)
+        for record in records:
+            record[stage] = {"ms": round(share, 4), "calls": 1}
+            record["total"]["ms"] = round(record["total"]["ms"] + share, 4)
+            self.summary.add_stage(stage, share)
+        self.summary.total_ms += ms
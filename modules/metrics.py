@@ -0,0 +1,183 @@
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self.values.get(labels, 0)
+
+    def merge_values(self, values: Dict[Tuple[str, ...], float]):
+        for labels, value in values.items():
+            self.values[labels] = self.values.get(labels, 0) + value
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self.values.items())]
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str, count: int = 1):
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += count
+        state[-1] += value * count
+
+    def count(self, *labels: str) -> int:
+        state = self.values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def merge_values(self, values: Dict[Tuple[str, ...], List[float]]):
+        for labels, other in values.items():
+            state = self.values.get(labels)
+            if state is None:
+                self.values[labels] = list(other)
+            else:
+                for idx, value in enumerate(other):
+                    state[idx] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, state in sorted(self.values.items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += observed
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.families: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, family):
+        existing = self.families.get(family.name)
+        if existing is not None:
+            if existing.kind != family.kind or existing.labelnames != family.labelnames:
+                raise ValueError(f"Metric '{family.name}' is already registered with a different type or labels.")
+            return existing
+        self.families[family.name] = family
+        return family
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        snapshot = {}
+        for name, family in self.families.items():
+            if not family.values: continue
+            snapshot[name] = {
+                "kind": family.kind,
+                "help": family.help,
+                "labelnames": family.labelnames,
+                "buckets": getattr(family, "buckets", None),
+                "values": {labels: (list(v) if isinstance(v, list) else v) for labels, v in family.values.items()}
+            }
+        return snapshot
+
+    def drain(self) -> Dict[str, Dict[str, Any]]:
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Dict[str, Any]]):
+        with self._lock:
+            for name, data in snapshot.items():
+                family = self.families.get(name)
+                if family is None:
+                    if data["kind"] == "histogram":
+                        family = self.histogram(name, data["help"], data["labelnames"], data["buckets"])
+                    else:
+                        family = self.counter(name, data["help"], data["labelnames"])
+                family.merge_values(data["values"])
+
+    def reset(self):
+        for family in self.families.values():
+            family.values.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self.families):
+                family = self.families[name]
+                lines.append(f"# HELP {name} {family.help}")
+                lines.append(f"# TYPE {name} {family.kind}")
+                lines.extend(family.samples())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from .grader import Grader, CompiledQuestion, failed_result
+from .instrumentation import Instrumentation
+from .metrics import REGISTRY
+from .sql_processor import CompiledSchema, compile_schema
+
+DEFAULT_SCHEMA = "default"
+
+_worker_graders = {}
+_worker_questions = {}
+
+def _init_worker(schemas: Dict[str, CompiledSchema], cache_size: int, in_place: bool, instrument: bool = False):
+    REGISTRY.reset()
+    instrumentation = Instrumentation() if instrument else None
+    for name, schema in schemas.items():
+        _worker_graders[name] = Grader(schema, cache_size=cache_size, in_place=in_place, instrumentation=instrumentation)
+
+def _grade_chunk(task: Tuple[str, Any, List[str]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    schema_name, gt_sqls, chunk = task
+    grader = _worker_graders[schema_name]
+    question = gt_sqls
+    if not isinstance(gt_sqls, CompiledQuestion):
+        key = (schema_name, gt_sqls)
+        question = _worker_questions.get(key)
+        if question is None:
+            question = _worker_questions[key] = grader.compile(list(gt_sqls))
+
+    try:
+        results = grader.evaluate_batch(chunk, question)
+    except Exception:
+        results = [_grade_one(grader, sql, question) for sql in chunk]
+    return results, REGISTRY.drain()
+
+def _grade_one(grader: Grader, sql: str, question: CompiledQuestion) -> Dict[str, Any]:
+    try:
+        return grader.evaluate_compiled(sql, question)
+    except Exception as e:
+        return failed_result(e)
+
+class ParallelGrader:
+    def __init__(self, schemas: Dict[str, Dict[str, Dict[str, str]]], jobs: Optional[int] = None,
+                 chunk_size: Optional[int] = None, cache_size: int = 1024, in_place: bool = False, instrument: bool = False):
+        self.schemas = schemas
+        self.jobs = jobs or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=({name: compile_schema(schema) for name, schema in schemas.items()}, cache_size, in_place, instrument)
+        )
+
+    def _chunks(self, submissions: List[str]) -> List[List[str]]:
+        size = self.chunk_size
+        if not size:
+            size = max(1, min(64, -(-len(submissions) // (self.jobs * 4))))
+        return [submissions[i:i + size] for i in range(0, len(submissions), size)]
+
+    def evaluate_batch(self, submissions: List[str], gt_sqls: List[str], schema_name: str = DEFAULT_SCHEMA) -> List[Dict[str, Any]]:
+        return self.evaluate_many([(submissions, gt_sqls, schema_name)])[0]
+
+    def evaluate_many(self, batches: List[Tuple[List[str], List[str], str]]) -> List[List[Dict[str, Any]]]:
+        tasks = []
+        owners = []
+        for idx, (submissions, gt_sqls, schema_name) in enumerate(batches):
+            for chunk in self._chunks(list(submissions)):
+                question = gt_sqls if isinstance(gt_sqls, CompiledQuestion) else tuple(gt_sqls)
+                tasks.append((schema_name, question, chunk))
+                owners.append(idx)
+
+        results = [[] for _ in batches]
+        for idx, (chunk_results, metrics) in zip(owners, self.executor.map(_grade_chunk, tasks)):
+            results[idx].extend(chunk_results)
+            REGISTRY.merge(metrics)
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def grade_parallel(schema: Dict[str, Dict[str, str]], submissions: List[str], gt_sqls: List[str],
+                   jobs: Optional[int] = None, chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    with ParallelGrader({DEFAULT_SCHEMA: schema}, jobs=jobs, chunk_size=chunk_size) as pool:
+        return pool.evaluate_batch(submissions, gt_sqls)
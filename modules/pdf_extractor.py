@@ -1,6 +1,13 @@
 import pdfplumber
 import re
+import time
 from typing import Dict, List, Any
+from .metrics import REGISTRY
+
+PDF_DOCUMENTS = REGISTRY.counter("assessql_pdf_documents_total", "PDFs processed by status.", ("status",))
+PDF_PAGES = REGISTRY.counter("assessql_pdf_pages_total", "PDF pages scanned.")
+PDF_QUESTIONS = REGISTRY.counter("assessql_pdf_questions_total", "Question groups extracted from PDFs.")
+PDF_SECONDS = REGISTRY.histogram("assessql_pdf_extract_seconds", "Wall time of PDF extraction.")
 
 class PDFExtractor:
     def __init__(self, pdf_path: str):
@@ -8,16 +15,25 @@ class PDFExtractor:
         self.grouped_data = {} 
 
     def process(self) -> Dict[str, Any]:
+        start = time.perf_counter()
         all_elements = []
 
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                all_elements.extend(self._extract_elements_from_page(page, page_num))
+        try:
+            with pdfplumber.open(self.pdf_path) as pdf:
+                for page_num, page in enumerate(pdf.pages):
+                    all_elements.extend(self._extract_elements_from_page(page, page_num))
+                    PDF_PAGES.inc()
+        except Exception:
+            PDF_DOCUMENTS.inc("error")
+            raise
 
         sorted_stream = sorted(all_elements, key=lambda x: (x['page'], x['top']))
 
         self._process_stream(sorted_stream)
 
+        PDF_DOCUMENTS.inc("ok")
+        PDF_QUESTIONS.inc(amount=len(self.grouped_data))
+        PDF_SECONDS.observe(time.perf_counter() - start)
         return self.grouped_data
 
     def _extract_elements_from_page(self, page, page_num):
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import List, Dict, Any, Optional, Tuple
+from .grader import GRADER_VERSION, Grader, CompiledQuestion
+from .instrumentation import Instrumentation
+from .sql_processor import fingerprint_schema
+
+DEFAULT_SCHEMA = "default"
+
+class QuestionBank:
+    def __init__(self, schemas: Dict[str, Dict[str, Any]], questions: Dict[str, Tuple[str, List[str]]]):
+        self.schemas = schemas
+        self.questions = questions
+
+    @classmethod
+    def load(cls, path: str) -> "QuestionBank":
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        schemas = {name: schema for name, schema in data.get("schemas", {}).items()}
+        if "schema" in data:
+            schemas[DEFAULT_SCHEMA] = data["schema"]
+
+        entries = data.get("questions", {})
+        if isinstance(entries, list):
+            entries = {str(entry["question_id"]): entry for entry in entries}
+
+        questions = {}
+        for question_id, entry in entries.items():
+            schema = entry.get("schema", DEFAULT_SCHEMA)
+            if isinstance(schema, dict):
+                schema_name = f"question:{question_id}"
+                schemas[schema_name] = schema
+            else:
+                schema_name = schema
+            if schema_name not in schemas:
+                raise ValueError(f"Question '{question_id}' refers to unknown schema '{schema_name}'.")
+            questions[str(question_id)] = (schema_name, list(entry["ground_truths"]))
+
+        return cls(schemas, questions)
+
+class QuestionCache:
+    def __init__(self, bank: QuestionBank, cache_dir: Optional[str] = None, instrumentation: Optional[Instrumentation] = None):
+        self.bank = bank
+        self.instrumentation = instrumentation
+        self.cache_dir = os.path.join(cache_dir, "questions") if cache_dir else None
+        self.graders: Dict[str, Grader] = {}
+        self.compiled: Dict[str, CompiledQuestion] = {}
+        self.fingerprints = {name: fingerprint_schema(schema) for name, schema in bank.schemas.items()}
+        self.question_fingerprints: Dict[str, str] = {}
+        self.loaded = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def grader(self, schema_name: str) -> Grader:
+        grader = self.graders.get(schema_name)
+        if grader is None:
+            grader = self.graders[schema_name] = Grader(self.bank.schemas[schema_name], instrumentation=self.instrumentation)
+        return grader
+
+    def fingerprint(self, question_id: str) -> str:
+        fingerprint = self.question_fingerprints.get(question_id)
+        if fingerprint is None:
+            schema_name, gt_sqls = self.bank.questions[question_id]
+            payload = json.dumps([GRADER_VERSION, self.fingerprints[schema_name], gt_sqls])
+            fingerprint = self.question_fingerprints[question_id] = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return fingerprint
+
+    def submission_key(self, question_id: str, sql: str) -> str:
+        schema_name, _ = self.bank.questions[question_id]
+        return self.grader(schema_name).processor.cache_key(sql)
+
+    def _path(self, question_id: str) -> str:
+        return os.path.join(self.cache_dir, self.fingerprint(question_id) + ".pickle")
+
+    def question(self, question_id: str) -> CompiledQuestion:
+        question = self.compiled.get(question_id)
+        if question is not None:
+            return question
+
+        schema_name, gt_sqls = self.bank.questions[question_id]
+        path = self._path(question_id) if self.cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                question = pickle.load(f)
+            question.label = question_id
+            self.loaded += 1
+        else:
+            question = self.grader(schema_name).compile(gt_sqls)
+            question.label = question_id
+            if path:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(question, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)
+
+        self.compiled[question_id] = question
+        return question
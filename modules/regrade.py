@@ -0,0 +1,148 @@
+import json
+import os
+from typing import List, Dict, Any, Optional, Set, Tuple
+from .grader import Grader, CompiledQuestion, score_ratio
+
+class IncrementalRegrader:
+    def __init__(self, grader: Grader, gt_sqls: List[str]):
+        self.grader = grader
+        self.gt_sqls: List[str] = []
+        self.entries: List[Tuple[str, Set[str], str]] = []
+        self.submissions: Dict[Any, Dict[str, Any]] = {}
+        self.comparisons = 0
+
+        for gt_sql in gt_sqls:
+            self._append_gt(gt_sql)
+        self.question = self._compile()
+
+    def _append_gt(self, gt_sql: str) -> Optional[int]:
+        self.gt_sqls.append(gt_sql)
+        analyzed = self.grader.analyze(gt_sql)
+        if not analyzed:
+            return None
+        self.entries.append((gt_sql, analyzed[0], analyzed[1]))
+        return len(self.entries) - 1
+
+    def _compile(self) -> CompiledQuestion:
+        return CompiledQuestion(
+            list(self.gt_sqls),
+            [(gt_sql, features) for gt_sql, features, _ in self.entries],
+            [canonical for _, _, canonical in self.entries]
+        )
+
+    def _rescore(self, state: Dict[str, Any]):
+        vector = self.question.encode(state["features"])
+        row = self.question.score_matrix([vector])[0]
+        self.comparisons += len(row)
+
+        best_idx, best_ratio = self.grader._pick_best(row)
+        state["ratio"] = best_ratio
+        state["matched"] = best_idx
+        if best_idx is None:
+            state["result"] = self.grader._no_ground_truth_result(self.question.gt_sqls)
+        else:
+            state["result"] = self.grader._scored_result(self.question, vector, best_idx, row[best_idx])
+
+    def grade(self, submissions: Dict[Any, str]) -> Dict[Any, Dict[str, Any]]:
+        for submission_id, sql in submissions.items():
+            analyzed = self.grader.analyze(sql)
+            state = self.submissions[submission_id] = {"sql": sql, "features": analyzed[0] if analyzed else None}
+            if analyzed:
+                self._rescore(state)
+            else:
+                state.update(ratio=-1.0, matched=None, result=self.grader._error_result(self.question.gt_sqls))
+        return {submission_id: self.submissions[submission_id]["result"] for submission_id in submissions}
+
+    def results(self) -> Dict[Any, Dict[str, Any]]:
+        return {submission_id: state["result"] for submission_id, state in self.submissions.items()}
+
+    def add_ground_truth(self, gt_sql: str) -> List[Any]:
+        new_idx = self._append_gt(gt_sql)
+        self.question = self._compile()
+
+        changed = []
+        for submission_id, state in self.submissions.items():
+            if state["features"] is None:
+                state["result"] = self.grader._error_result(self.question.gt_sqls)
+                changed.append(submission_id)
+                continue
+            if new_idx is None:
+                continue
+
+            vector = self.question.encode(state["features"])
+            counts = self.question.score_one(vector, new_idx)
+            self.comparisons += 1
+
+            _, ratio = score_ratio(*counts)
+            if ratio > state["ratio"]:
+                state["ratio"] = ratio
+                state["matched"] = new_idx
+                state["result"] = self.grader._scored_result(self.question, vector, new_idx, counts)
+                changed.append(submission_id)
+
+        return changed
+
+    def remove_ground_truth(self, gt_sql: str) -> List[Any]:
+        if gt_sql not in self.gt_sqls:
+            raise ValueError(f"Ground truth is not part of this question: {gt_sql}")
+
+        self.gt_sqls.remove(gt_sql)
+        removed = next((idx for idx, entry in enumerate(self.entries) if entry[0] == gt_sql), None)
+        if removed is not None:
+            del self.entries[removed]
+        self.question = self._compile()
+
+        changed = []
+        for submission_id, state in self.submissions.items():
+            if state["features"] is None:
+                state["result"] = self.grader._error_result(self.question.gt_sqls)
+                changed.append(submission_id)
+            elif removed is None or state["matched"] is None or state["matched"] < removed:
+                continue
+            elif state["matched"] == removed:
+                self._rescore(state)
+                changed.append(submission_id)
+            else:
+                state["matched"] -= 1
+
+        return changed
+
+    def save(self, path: str):
+        payload = {
+            "gt_sqls": self.gt_sqls,
+            "entries": [[gt_sql, sorted(features), canonical] for gt_sql, features, canonical in self.entries],
+            "submissions": [
+                {
+                    "submission_id": submission_id,
+                    "sql": state["sql"],
+                    "features": None if state["features"] is None else sorted(state["features"]),
+                    "ratio": state["ratio"],
+                    "matched": state["matched"],
+                    "result": state["result"]
+                }
+                for submission_id, state in self.submissions.items()
+            ]
+        }
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, grader: Grader) -> "IncrementalRegrader":
+        with open(path, "r") as f:
+            payload = json.load(f)
+
+        regrader = cls.__new__(cls)
+        regrader.grader = grader
+        regrader.comparisons = 0
+        regrader.gt_sqls = payload["gt_sqls"]
+        regrader.entries = [(gt_sql, set(features), canonical) for gt_sql, features, canonical in payload["entries"]]
+        regrader.question = regrader._compile()
+        regrader.submissions = {}
+        for record in payload["submissions"]:
+            regrader.submissions[record.pop("submission_id")] = dict(
+                record, features=None if record["features"] is None else set(record["features"])
+            )
+        return regrader
@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Any, Optional, Tuple
+from .grader import GRADER_VERSION
+from .metrics import REGISTRY
+
+RESULT_CACHE = REGISTRY.counter("assessql_result_cache_requests_total", "Persistent result cache lookups by result.", ("result",))
+RESULT_CACHE_EVICTIONS = REGISTRY.counter("assessql_result_cache_evictions_total", "Results evicted from the persistent cache.")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    question TEXT NOT NULL,
+    submission TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (question, submission)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+class ResultCache:
+    def __init__(self, path: str, max_entries: int = 500_000, version: int = GRADER_VERSION, flush_every: int = 512):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._touched: Dict[Tuple[str, str], int] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+            stale = self.conn.execute("DELETE FROM results WHERE version != ?", (version,)).rowcount
+        self.invalidated = stale
+
+    def get(self, question: str, submission: str) -> Optional[Dict[str, Any]]:
+        key = (question, submission)
+        payload = self._pending.get(key)
+        if payload is None:
+            row = self.conn.execute(
+                "SELECT result FROM results WHERE question = ? AND submission = ? AND version = ?",
+                (question, submission, self.version)
+            ).fetchone()
+            payload = row[0] if row else None
+
+        if payload is None:
+            self.misses += 1
+            RESULT_CACHE.inc("miss")
+            return None
+
+        self.hits += 1
+        RESULT_CACHE.inc("hit")
+        self._touched[key] = time.time_ns()
+        if len(self._touched) >= self.flush_every:
+            self.flush()
+        return json.loads(payload)
+
+    def put(self, question: str, submission: str, result: Dict[str, Any]):
+        if result is None:
+            return
+        stored = {k: v for k, v in result.items() if k != "timings"}
+        self._pending[(question, submission)] = json.dumps(stored)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._pending and not self._touched:
+            return
+
+        now = time.time_ns()
+        with self.conn:
+            if self._pending:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO results (question, submission, version, result, last_used) VALUES (?, ?, ?, ?, ?)",
+                    [(q, s, self.version, payload, now) for (q, s), payload in self._pending.items()]
+                )
+            if self._touched:
+                self.conn.executemany(
+                    "UPDATE results SET last_used = ? WHERE question = ? AND submission = ?",
+                    [(used, q, s) for (q, s), used in self._touched.items()]
+                )
+            self._evict()
+
+        self._pending.clear()
+        self._touched.clear()
+
+    def _evict(self):
+        if self.max_entries is None:
+            return
+        count = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count <= self.max_entries:
+            return
+
+        excess = count - int(self.max_entries * 0.9)
+        self.conn.execute(
+            "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self.evictions += excess
+        RESULT_CACHE_EVICTIONS.inc(amount=excess)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] + len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidated": self.invalidated,
+            "size": len(self),
+            "max_entries": self.max_entries
+        }
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from .grader import exact_match_hit_rate
+from .instrumentation import percentile
+from .parallel import ParallelGrader
+from .question_bank import QuestionBank, QuestionCache
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class Overloaded(Exception):
+    pass
+
+def _grade_clustered(grader, sqls: List[str], question) -> List[Dict[str, Any]]:
+    results = grader.evaluate_clustered(sqls, question)["results"]
+    for result in results:
+        result.pop("cluster_id", None)
+    return results
+
+class MicroBatcher:
+    def __init__(self, grade, max_batch: int = 32, max_delay: float = 0.005, max_pending: int = 1024):
+        self.grade = grade
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.pending = 0
+        self.batches = 0
+        self.batched = 0
+        self._queues: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks = set()
+
+    async def submit(self, question_id: str, sql: str) -> Dict[str, Any]:
+        if self.pending >= self.max_pending:
+            raise Overloaded()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues.setdefault(question_id, [])
+        queue.append((sql, future))
+        self.pending += 1
+
+        if len(queue) >= self.max_batch:
+            self._flush(question_id)
+        elif question_id not in self._timers:
+            self._timers[question_id] = loop.call_later(self.max_delay, self._flush, question_id)
+
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+
+    def _flush(self, question_id: str):
+        timer = self._timers.pop(question_id, None)
+        if timer:
+            timer.cancel()
+
+        queue = self._queues.pop(question_id, None)
+        if queue:
+            self.batches += 1
+            self.batched += len(queue)
+            task = asyncio.ensure_future(self._run(question_id, queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, question_id: str, queue: List[Tuple[str, asyncio.Future]]):
+        try:
+            results = await self.grade(question_id, [sql for sql, _ in queue])
+        except Exception as e:
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(queue, results):
+            if not future.done():
+                future.set_result(result)
+
+class GradingService:
+    def __init__(self, bank: QuestionBank, cache_dir: Optional[str] = None, jobs: int = 1,
+                 max_batch: int = 32, max_delay: float = 0.005, max_pending: int = 1024,
+                 max_body: int = 1 << 20, latency_window: int = 10_000):
+        self.cache = QuestionCache(bank, cache_dir)
+        self.jobs = jobs
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=jobs if jobs > 1 else 1)
+        self.pool = ParallelGrader(bank.schemas, jobs=jobs) if jobs > 1 else None
+        self.batcher = MicroBatcher(self._grade, max_batch, max_delay, max_pending)
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {"requests": 0, "graded": 0, "rejected": 0, "errors": 0}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def warm(self):
+        for question_id in self.cache.bank.questions:
+            self.cache.question(question_id)
+
+    async def _grade(self, question_id: str, sqls: List[str]) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        schema_name, _ = self.cache.bank.questions[question_id]
+        question = self.cache.question(question_id)
+        if self.pool:
+            return await loop.run_in_executor(self.executor, self.pool.evaluate_batch, sqls, question, schema_name)
+        return await loop.run_in_executor(self.executor, _grade_clustered, self.cache.grader(schema_name), sqls, question)
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = list(self.latencies)
+        batches = self.batcher.batches
+        return {
+            **self.counters,
+            "pending": self.batcher.pending,
+            "batches": batches,
+            "avg_batch_size": round(self.batcher.batched / batches, 2) if batches else 0.0,
+            "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "exact_match_hit_rate": round(exact_match_hit_rate(), 4),
+            "compiled_questions": len(self.cache.compiled)
+        }
+
+    async def handle_grade(self, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e.msg}"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "Expected a JSON object."}
+
+        question_id = str(payload.get("question_id"))
+        sql = payload.get("sql")
+        if not isinstance(sql, str) or not sql.strip():
+            return 400, {"error": "Missing 'sql' field."}
+        if question_id not in self.cache.bank.questions:
+            return 404, {"error": f"Unknown question_id '{payload.get('question_id')}'."}
+
+        start = time.perf_counter()
+        try:
+            result = await self.batcher.submit(question_id, sql)
+        except Overloaded:
+            self.counters["rejected"] += 1
+            return 503, {"error": "Grader is at capacity, retry shortly."}
+
+        self.latencies.append(time.perf_counter() - start)
+        self.counters["graded"] += 1
+        response = {"submission_id": payload.get("submission_id"), "question_id": payload.get("question_id")}
+        response.update(result)
+        return 200, response
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path == "/grade":
+            if method != "POST":
+                return 405, {"error": "Use POST."}
+            return await self.handle_grade(body)
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path == "/health":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"No route for {path}."}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) < 2:
+                    await self._respond(writer, 400, {"error": "Malformed request line."}, close=True)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = headers.get("content-length", "0")
+                if not length.isdigit():
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length."}, close=True)
+                    break
+                length = int(length)
+                if length > self.max_body:
+                    await self._respond(writer, 413, {"error": "Request body too large."}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.counters["requests"] += 1
+                try:
+                    status, payload = await self.route(parts[0].upper(), parts[1].split("?")[0], body)
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    status, payload = 500, {"error": str(e)}
+
+                close = headers.get("connection", "").lower() == "close" or parts[-1] == "HTTP/1.0"
+                headers_out = {"Retry-After": "1"} if status == 503 else None
+                await self._respond(writer, status, payload, close=close, headers=headers_out)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                       close: bool = False, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'close' if close else 'keep-alive'}"
+        ]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server
+
+    @property
+    def port(self) -> Optional[int]:
+        if not self.server or not self.server.sockets:
+            return None
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+        if self.pool:
+            self.pool.close()
+
+async def serve(bank: QuestionBank, host: str, port: int, **options):
+    service = GradingService(bank, **options)
+    service.warm()
+    await service.start(host, port)
+    print(f"AssessQL grading service listening on http://{host}:{service.port}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
@@ -1,51 +1,197 @@
-from sqlglot import exp, TokenType, tokenize, parse_one
+import hashlib
+import json
+import re
+import time
+from sqlglot import exp, TokenType, ParseError, tokenize
+from sqlglot.dialects import Dialect
+from sqlglot.tokens import Token
 from sqlglot.optimizer.qualify import qualify
-from typing import Dict, Any, Optional
+from sqlglot.schema import MappingSchema
+from typing import Dict, Any, Optional, Callable, List
 from collections import defaultdict
+from .cache import LRUCache
+from .instrumentation import Instrumentation
+from .metrics import REGISTRY
+
+DIALECT = Dialect.get_or_raise("postgres")
+
+STATEMENT_TOKENS = (TokenType.SELECT, TokenType.UPDATE, TokenType.INSERT, TokenType.DELETE, TokenType.ALTER, TokenType.DROP)
+STATEMENT_KEYWORDS = {"select", "update", "insert", "delete", "alter", "drop"}
+
+SYNTAX_REJECTIONS = REGISTRY.counter("assessql_syntax_rejections_total", "Queries rejected by parse_and_optimize.")
+PARSE_CACHE = REGISTRY.counter("assessql_parse_cache_requests_total", "Normalized AST cache lookups by result.", ("result",))
+
+_LEADING_WORD_RE = re.compile(r"\s*(\w*)")
+_DIALECT_STRING_RE = re.compile(r"\$|(?<![\w'])[bex]'", re.IGNORECASE)
+_UNFOLDABLE = ("\\", "--", "/*", "$")
+_QUOTED_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+def normalize_sql_text(sql_query: str) -> str:
+    sql_query = sql_query.strip().rstrip(";").strip()
+    if any(marker in sql_query for marker in _UNFOLDABLE):
+        return sql_query
+
+    parts = _QUOTED_RE.split(sql_query)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i]).lower()
+
+    for i in range(1, len(parts), 2):
+        if parts[i].startswith('"'):
+            parts[i] = parts[i].lower()
+
+    return "".join(parts)
+
+def fingerprint_schema(schema: Dict[str, Dict[str, Any]]) -> str:
+    payload = json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class CompiledSchema(MappingSchema):
+    def add_table(self, *args, **kwargs):
+        raise TypeError("CompiledSchema is immutable; build a new SQLProcessor schema instead.")
+
+def compile_schema(schema: Dict[str, Dict[str, Any]]) -> CompiledSchema:
+    mapping = {
+        str(table).lower(): {str(column).lower(): str(col_type) for column, col_type in columns.items()}
+        for table, columns in schema.items()
+    }
+    return CompiledSchema(mapping, normalize=False)
 
 class SQLProcessor:
-    def __init__(self, schema: Dict[str, Dict[str, str]]):
+    def __init__(self, schema: Dict[str, Dict[str, str]], cache_size: int = 1024, in_place: bool = False,
+                 instrumentation: Optional[Instrumentation] = None):
+        self.cache = LRUCache(cache_size)
+        self.in_place = in_place
+        self.instrumentation = instrumentation
         self.schema = schema
 
+    @property
+    def schema(self) -> Dict[str, Dict[str, str]]:
+        return self._schema
+
+    @schema.setter
+    def schema(self, schema: Dict[str, Dict[str, str]]):
+        if isinstance(schema, CompiledSchema):
+            self.compiled_schema = schema
+            schema = schema.mapping
+        else:
+            self.compiled_schema = compile_schema(schema)
+
+        self._schema = schema
+        self.schema_fingerprint = fingerprint_schema(schema)
+        self.cache.clear()
+
+    def cache_key(self, sql_query: str) -> str:
+        payload = f"{self.schema_fingerprint}\0{normalize_sql_text(sql_query)}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def parse_normalized(self, sql_query: str, normalize: Callable[[exp.Expression], exp.Expression]) -> Optional[exp.Expression]:
+        timer = self.instrumentation
+        lap = time.perf_counter() if timer else 0.0
+
+        key = self.cache_key(sql_query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            PARSE_CACHE.inc("hit")
+            expression = cached.copy()
+            if timer: timer.lap("cache_hit", lap, expression)
+            return expression
+        PARSE_CACHE.inc("miss")
+        if timer: timer.lap("cache_miss", lap)
+
+        expression = self.parse_and_optimize(sql_query)
+        if not expression:
+            return None
+
+        expression = normalize(expression)
+        if self.cache.maxsize <= 0:
+            return expression
+
+        lap = time.perf_counter() if timer else 0.0
+        self.cache.put(key, expression)
+        expression = expression.copy()
+        if timer: timer.lap("cache_store", lap)
+        return expression
+
     def parse_and_optimize(self, sql_query: str) -> Optional[exp.Expression]:
+        timer = self.instrumentation
+        started = lap = timer.begin() if timer else 0.0
         try:
-            self._validate_structure(sql_query)
-            expression = parse_one(sql_query, read="postgres")
+            tokens = self._validate_structure(sql_query)
+            if timer: lap = timer.lap("tokenize", lap, tokens)
+            expression = self._parse_tokens(tokens, sql_query)
+            if timer: lap = timer.lap("parse", lap, expression)
             
             expression = self._normalize_casing(expression)
+            if timer: lap = timer.lap("normalize_casing", lap, expression)
 
             expression = qualify(
                 expression, 
-                schema=self.schema,
+                schema=self.compiled_schema,
                 quote_identifiers=False,
                 validate_qualify_columns=False
             )
+            if timer: lap = timer.lap("qualify", lap, expression)
 
             expression = self._standardize_aliases(expression)
+            if timer: timer.lap("standardize_aliases", lap, expression)
             
             return expression
 
         except Exception as e:
+            if timer: timer.lap("rejected", lap)
+            SYNTAX_REJECTIONS.inc()
             print(f"SQL Processing Error for '{sql_query}': {e}")
             return None
 
-    def _validate_structure(self, sql_query: str):
-        tokens = tokenize(sql_query)
+        finally:
+            if timer: timer.end(started)
+
+    def _validate_structure(self, sql_query: str) -> List[Token]:
+        self._prevalidate(sql_query)
+
+        tokens = DIALECT.tokenize(sql_query)
         if not tokens:
-            return
+            return tokens
 
         first_token = tokens[0]
         
-        if first_token.token_type not in [TokenType.SELECT, TokenType.UPDATE, TokenType.INSERT, TokenType.DELETE, TokenType.ALTER, TokenType.DROP]:
+        if first_token.token_type not in STATEMENT_TOKENS:
+            raise ValueError("Invalid SQL Syntax.")
+
+        if _DIALECT_STRING_RE.search(sql_query):
+            generic_tokens = tokenize(sql_query)
+            if generic_tokens and generic_tokens[0].token_type not in STATEMENT_TOKENS:
+                raise ValueError("Invalid SQL Syntax.")
+
+        return tokens
+
+    def _prevalidate(self, sql_query: str):
+        stripped = sql_query.lstrip()
+        if not stripped:
+            raise ValueError("Empty SQL.")
+
+        if stripped.startswith(("--", "/*")):
+            return
+
+        leading_word = _LEADING_WORD_RE.match(stripped).group(1)
+        if leading_word.lower() not in STATEMENT_KEYWORDS:
             raise ValueError("Invalid SQL Syntax.")
 
+    def _parse_tokens(self, tokens: List[Token], sql_query: str) -> exp.Expression:
+        for expression in DIALECT.parser().parse(tokens, sql_query):
+            if not expression:
+                break
+            return expression
+
+        raise ParseError(f"No expression was parsed from '{sql_query}'")
+
     def _normalize_casing(self, expression: exp.Expression) -> exp.Expression:
         def transform(node):
             if isinstance(node, exp.Identifier):
                 node.set("this", node.this.lower())
                 node.set("quoted", False)
             return node
-        return expression.transform(transform)
+        return expression.transform(transform, copy=not self.in_place)
 
     def _standardize_aliases(self, expression: exp.Expression) -> exp.Expression:
         table_counts = defaultdict(int)
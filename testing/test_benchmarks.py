@@ -0,0 +1,32 @@
+import copy
+import json
+import os
+import tempfile
+from benchmarks.run_benchmarks import STAGES, compare, run_benchmarks
+
+def run_test():
+    print("--- SCENARIO 1: STAGE TIMINGS ON A CORPUS SLICE ---")
+    report = run_benchmarks(repeat=1, warmup=0, limit=5, memory_sample=20)
+    meta = report["meta"]
+    print(f"questions={meta['questions']} submissions={meta['submissions']}")
+    for stage in STAGES:
+        r = report["stages"][stage]
+        print(f"{stage:<20} ops={r['ops']:<5} ops/sec={r['ops_per_sec']:<10} p50={r['p50_ms']}ms p95={r['p95_ms']}ms p99={r['p99_ms']}ms peak={r['peak_kb']}KB")
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.json")
+    with open(path, "w") as f:
+        json.dump(report, f)
+    with open(path) as f:
+        print(f"JSON round trip keeps every stage: {sorted(json.load(f)['stages']) == sorted(STAGES)}")
+
+    print("\n--- SCENARIO 2: REGRESSION THRESHOLD ---")
+    print(f"Same run flagged: {[row['stage'] for row in compare(report, report) if row['regression']]}")
+
+    faster_baseline = copy.deepcopy(report)
+    faster_baseline["stages"]["evaluate"]["ops_per_sec"] *= 1.5
+    faster_baseline["stages"]["extract_features"]["p95_ms"] /= 1.05
+    flagged = [row["stage"] for row in compare(faster_baseline, report, threshold=0.10) if row["regression"]]
+    print(f"Baseline 50% faster on evaluate, 5% on extract_features p95 -> flagged: {flagged}")
+
+if __name__ == "__main__":
+    run_test()
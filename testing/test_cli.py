@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from modules.dataset import BASE_DIR, load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+
+CLI = os.path.join(BASE_DIR, "assessql.py")
+
+def _write_bank(path, questions, schemas):
+    bank = {
+        "schemas": {q["db_id"]: schemas[q["db_id"]] for q in questions},
+        "questions": {str(i): {"schema": q["db_id"], "ground_truths": ground_truths(q)} for i, q in enumerate(questions)}
+    }
+    bank["questions"]["broken"] = {"schema": questions[0]["db_id"], "ground_truths": ["from head select age"]}
+    with open(path, "w") as f:
+        json.dump(bank, f)
+
+def _write_submissions(path, questions, count, seed=1):
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for idx in range(count):
+            q_idx = rng.randrange(len(questions))
+            sql = rng.choice(submissions(questions[q_idx]))
+            f.write(json.dumps({"submission_id": idx, "question_id": str(q_idx), "sql": sql}) + "\n")
+
+def _run(args, stdin=None):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, CLI, "grade"] + args, input=stdin, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    lines = [json.loads(line) for line in proc.stdout.splitlines()]
+    return lines, proc.stderr, elapsed
+
+def run_test():
+    questions = load_questions()[:20]
+    schemas = load_schemas()
+    work_dir = tempfile.mkdtemp(prefix="assessql_cli_")
+    bank_path = os.path.join(work_dir, "bank.json")
+    input_path = os.path.join(work_dir, "submissions.jsonl")
+    cache_dir = os.path.join(work_dir, "cache")
+    _write_bank(bank_path, questions, schemas)
+    _write_submissions(input_path, questions, 1000)
+
+    print("--- SCENARIO 1: STREAMED JSONL MATCHES Grader.evaluate ---")
+    lines, stderr, elapsed = _run(["-q", bank_path, input_path])
+    with redirect_stdout(io.StringIO()):
+        graders = {q["db_id"]: Grader(schemas[q["db_id"]]) for q in questions}
+        expected = []
+        with open(input_path) as f:
+            for line in f:
+                record = json.loads(line)
+                question = questions[int(record["question_id"])]
+                expected.append(graders[question["db_id"]].evaluate(record["sql"], ground_truths(question)))
+
+    same = all({k: v for k, v in line.items() if k not in ("submission_id", "question_id")} == result
+               for line, result in zip(lines, expected))
+    in_order = [line["submission_id"] for line in lines] == list(range(1000))
+    print(f"{len(lines)} results in {elapsed:.2f}s, in input order: {in_order}, identical: {same}")
+    print(f"Progress line: {stderr.strip().splitlines()[-1]}")
+
+    print("\n--- SCENARIO 2: --jobs, --limit, --cache-dir ---")
+    parallel, _, elapsed = _run(["-q", bank_path, input_path, "--jobs", "2", "--window", "128"])
+    print(f"--jobs 2: {len(parallel)} results in {elapsed:.2f}s, identical to serial: {parallel == lines}")
+
+    limited, _, _ = _run(["-q", bank_path, "--limit", "25"], stdin=open(input_path).read())
+    print(f"--limit 25 from stdin: {len(limited)} results")
+
+    for label in ("cold", "warm"):
+        cached, _, elapsed = _run(["-q", bank_path, input_path, "--cache-dir", cache_dir])
+        print(f"--cache-dir ({label}): {elapsed:.2f}s, {len(os.listdir(os.path.join(cache_dir, 'questions')))} compiled questions on disk, identical: {cached == lines}")
+
+    print("\n--- SCENARIO 3: CSV INPUT AND BAD RECORDS ---")
+    csv_input = "submission_id,question_id,sql\n" \
+                "a,0,\"SELECT COUNT(*) FROM HEAD WHERE AGE > 56\"\n" \
+                "b,999,SELECT 1\n" \
+                "c,0,\n" \
+                "d,0,SELEC COUNT(*) FROM HEAD\n" \
+                "e,broken,SELECT age FROM head\n" \
+                "f,0,SELECT COUNT(*) FROM HEAD WHERE AGE > 56\n"
+    for jobs in ("1", "2"):
+        print(f"--jobs {jobs}:")
+        for line in _run(["-q", bank_path, "--format", "csv", "--jobs", jobs], stdin=csv_input)[0]:
+            print(f"{line['submission_id']}: {line.get('error') or str(line['percentage']) + '%'}")
+
+    jsonl_input = "[1, 2]\n" \
+                  '{"submission_id": "g", "question_id": "0", "sql": 42}\n' \
+                  '{"submission_id": "h", "question_id": "0", "sql": "SELECT COUNT(*) FROM HEAD WHERE AGE > 56"}\n'
+    for jobs in ("1", "2"):
+        print(f"JSONL --jobs {jobs}:")
+        for line in _run(["-q", bank_path, "--format", "jsonl", "--jobs", jobs], stdin=jsonl_input)[0]:
+            print(f"{line['submission_id']}: {line.get('error') or str(line['percentage']) + '%'}")
+
+    print("\n--- SCENARIO 4: MEMORY STAYS FLAT AS INPUT GROWS ---")
+    for count in (2000, 10000):
+        path = os.path.join(work_dir, f"submissions_{count}.jsonl")
+        output_path = os.path.join(work_dir, f"results_{count}.jsonl")
+        _write_submissions(path, questions, count, seed=count)
+
+        start = time.perf_counter()
+        probe = subprocess.run(
+            [sys.executable, "-c",
+             "import resource, subprocess, sys; "
+             "subprocess.run(sys.argv[2:], stdout=open(sys.argv[1], 'w'), stderr=subprocess.DEVNULL); "
+             "print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)",
+             output_path, sys.executable, CLI, "grade", "-q", bank_path, path],
+            capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - start
+        with open(output_path) as f:
+            results = sum(1 for _ in f)
+        print(f"{count:>6} submissions: {results} results in {elapsed:.2f}s, peak RSS {int(probe.stdout) / 1024:.1f}MB")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,81 @@
+import io
+import random
+import time
+from contextlib import redirect_stdout
+from modules.dataset import load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+
+LAB_SIZE = 400
+
+def _variant(sql, rng):
+    choice = rng.randrange(5)
+    if choice == 0 and "'" not in sql:
+        sql = sql.lower()
+    elif choice == 1:
+        sql = sql.replace(" ", "  ")
+    elif choice == 2:
+        sql = sql.replace(" FROM ", "\nFROM ").replace(" WHERE ", "\n  WHERE ")
+    elif choice == 3:
+        sql = sql.rstrip(";") + ";"
+    return sql
+
+def _lab(question, rng):
+    correct = ground_truths(question)
+    answers = submissions(question)
+    weights = [6 if sql in correct else 1 for sql in answers]
+    return [_variant(rng.choices(answers, weights)[0], rng) for _ in range(LAB_SIZE)]
+
+def _strip(result):
+    return {k: v for k, v in result.items() if k != "cluster_id"}
+
+def run_test():
+    rng = random.Random(7)
+    questions = load_questions()[:12]
+    schemas = load_schemas()
+    labs = [(_lab(q, rng), ground_truths(q), q["db_id"]) for q in questions]
+
+    print(f"--- CLUSTERED GRADING: {len(labs)} questions x {LAB_SIZE} submissions ---")
+
+    totals = {"batch": 0.0, "clustered": 0.0}
+    mismatches = 0
+    distinct = 0
+    reports = []
+    for subs, gts, db_id in labs:
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            expected = Grader(schemas[db_id]).evaluate_batch(subs, gts)
+            totals["batch"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            report = Grader(schemas[db_id]).evaluate_clustered(subs, gts)
+            totals["clustered"] += time.perf_counter() - start
+
+        mismatches += sum(_strip(a) != b for a, b in zip(report["results"], expected))
+        distinct += report["distinct"]
+        reports.append(report)
+
+    total = len(labs) * LAB_SIZE
+    print(f"Distinct canonical forms: {distinct}/{total} ({(1 - distinct / total) * 100:.1f}% collapsed)")
+    print(f"evaluate_batch    : {totals['batch']:.2f}s")
+    print(f"evaluate_clustered: {totals['clustered']:.2f}s")
+    print(f"Results identical to per-submission grading: {mismatches == 0} ({mismatches} mismatches)")
+
+    print("\n--- CLUSTERS FOR REVIEW (first question) ---")
+    print(f"Question: {questions[0]['question']}")
+    for cluster in reports[0]["clusters"]:
+        print(f"[{cluster['size']:>3} students] {cluster['percentage']:>6}%  {cluster['representative_sql']}")
+
+    print("\n--- FAN-OUT RESULTS ARE INDEPENDENT COPIES ---")
+    results = reports[0]["results"]
+    first, second = [r for r in results if r["cluster_id"] == results[0]["cluster_id"]][:2]
+    first.setdefault("feedback", {}).setdefault("missing", []).append("instructor note")
+    print(f"Mutating one member leaves the other untouched: {'instructor note' not in second.get('feedback', {}).get('missing', [])}")
+
+    print("\n--- QUESTION WITHOUT A VALID GROUND TRUTH ---")
+    with redirect_stdout(io.StringIO()):
+        report = Grader(schemas[questions[0]["db_id"]]).evaluate_clustered(labs[0][0][:20], ["from head select age"])
+    errors = {r.get("error") for r in report["results"]}
+    print(f"{len(report['results'])} results, errors: {sorted(errors)}")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import tempfile
+import time
+from modules.dataset import BASE_DIR
+from modules.data_generator import DataGenerator, compile_specs, load_schema_sql
+from modules.db_pool import ConnectionPool
+
+SCHEMA_DIR = os.path.join(BASE_DIR, "prev_ver", "data", "databases")
+
+PDF_SCHEMA = {
+    "EMP": {
+        "eno": {"type": "varchar", "constraint": "PK"},
+        "ename": {"type": "varchar", "constraint": "Not null"},
+        "basic-sal": {"type": "integer", "constraint": "Default value 5000"},
+        "incentive": {"type": "integer", "constraint": "Should not be greater than basic_sal"},
+        "dept_no": {"type": "varchar", "constraint": "Refers to dno of Dept table"},
+        "mgr_id": {"type": "varchar", "constraint": "Refers to eno DEPT"}
+    },
+    "DEPT": {
+        "dno": {"type": "varchar", "constraint": "PK"},
+        "dname": {"type": "varchar", "constraint": "Not null"}
+    }
+}
+
+def check_instance(path, tables):
+    conn = sqlite3.connect(path)
+    problems = []
+    try:
+        for name, table in tables.items():
+            count = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            if table.primary_key:
+                key = ", ".join(f'"{k}"' for k in table.primary_key)
+                distinct = conn.execute(f'SELECT COUNT(*) FROM (SELECT DISTINCT {key} FROM "{name}")').fetchone()[0]
+                if distinct != count:
+                    problems.append(f"{name}: duplicate primary key")
+
+            for column in table.columns:
+                if column.not_null:
+                    nulls = conn.execute(f'SELECT COUNT(*) FROM "{name}" WHERE "{column.name}" IS NULL').fetchone()[0]
+                    if nulls:
+                        problems.append(f"{name}.{column.name}: {nulls} NULLs")
+                if column.references:
+                    target_table, target_column = column.references
+                    orphans = conn.execute(
+                        f'SELECT COUNT(*) FROM "{name}" WHERE "{column.name}" IS NOT NULL AND "{column.name}" NOT IN (SELECT "{target_column}" FROM "{target_table}")'
+                    ).fetchone()[0]
+                    if orphans:
+                        problems.append(f"{name}.{column.name}: {orphans} orphan references")
+                if isinstance(column.upper_bound, str):
+                    violations = conn.execute(f'SELECT COUNT(*) FROM "{name}" WHERE "{column.name}" > "{column.upper_bound}"').fetchone()[0]
+                    if violations:
+                        problems.append(f"{name}.{column.name}: {violations} rows above {column.upper_bound}")
+                if isinstance(column.lower_bound, str):
+                    violations = conn.execute(f'SELECT COUNT(*) FROM "{name}" WHERE "{column.name}" <= "{column.lower_bound}"').fetchone()[0]
+                    if violations:
+                        problems.append(f"{name}.{column.name}: {violations} rows not above {column.lower_bound}")
+    finally:
+        conn.close()
+    return problems
+
+def run_test():
+    cache_dir = tempfile.mkdtemp(prefix="assessql_instances_")
+    generator = DataGenerator(cache_dir, rows=20)
+
+    schemas = {"PDF extract": PDF_SCHEMA}
+    for question in sorted(os.listdir(SCHEMA_DIR)):
+        path = os.path.join(SCHEMA_DIR, question, "schema.sql")
+        schema = load_schema_sql(path) if os.path.exists(path) else {}
+        if schema:
+            schemas[question] = schema
+
+    print("--- SCENARIO 1: CONSTRAINT-AWARE INSTANCES ---")
+    for label, schema in schemas.items():
+        tables = compile_specs(schema)
+        db_dir, db_ids = generator.generate(schema, seeds=3)
+        problems = []
+        for db_id in db_ids:
+            problems += check_instance(os.path.join(db_dir, db_id, f"{db_id}.sqlite"), tables)
+
+        refs = [f"{t.name}.{c.name}->{c.references[0]}.{c.references[1]}" for t in tables.values() for c in t.columns if c.references]
+        print(f"{label}: tables={list(tables)} keys={[t.primary_key for t in tables.values()]}")
+        print(f"  references: {refs}")
+        print(f"  {len(db_ids)} instances, violations: {problems or 'none'}")
+
+    print("\n--- SCENARIO 2: SEEDS ARE DETERMINISTIC AND DISTINCT ---")
+    db_dir, db_ids = generator.generate(PDF_SCHEMA, seeds=3)
+    other_dir = tempfile.mkdtemp(prefix="assessql_instances_")
+    rebuilt_dir, _ = DataGenerator(other_dir, rows=20).generate(PDF_SCHEMA, seeds=3)
+
+    def dump(directory, db_id):
+        conn = sqlite3.connect(os.path.join(directory, db_id, f"{db_id}.sqlite"))
+        try:
+            return conn.execute('SELECT * FROM "emp" ORDER BY "eno"').fetchall()
+        finally:
+            conn.close()
+
+    print(f"Same seed rebuilt elsewhere identical: {dump(db_dir, 'instance_0') == dump(rebuilt_dir, 'instance_0')}")
+    print(f"Seed 0 differs from seed 1: {dump(db_dir, 'instance_0') != dump(db_dir, 'instance_1')}")
+    print(f"Sample rows: {dump(db_dir, 'instance_0')[:3]}")
+
+    print("\n--- SCENARIO 3: INSTANCES ARE CACHED PER SCHEMA HASH ---")
+    cached_generator = DataGenerator(cache_dir, rows=20)
+    start = time.perf_counter()
+    for schema in schemas.values():
+        cached_generator.generate(schema, seeds=3)
+    elapsed = time.perf_counter() - start
+    print(f"Second pass built {cached_generator.built} instances in {elapsed * 1000:.2f}ms")
+    print(f"Cache layout: {sorted(os.listdir(cache_dir))[:2]} ...")
+
+    print("\n--- SCENARIO 4: QUERYING INSTANCES THROUGH THE POOL ---")
+    pool = ConnectionPool(db_dir)
+    sql = 'SELECT d.dname, COUNT(*) FROM emp e JOIN dept d ON e.dept_no = d.dno GROUP BY d.dname ORDER BY d.dname'
+    for db_id in db_ids:
+        with pool.checkout(db_id) as conn:
+            print(f"{db_id}: {conn.execute(sql).fetchall()[:3]}")
+    pool.close()
+
+    print("\n--- SCENARIO 5: BOUNDS WITH MISMATCHED TYPES ARE IGNORED ---")
+    mixed_schema = {
+        "ITEM": {
+            "code": {"type": "varchar", "constraint": "PK"},
+            "label": {"type": "varchar(10)", "constraint": "Should be greater than 5"},
+            "added": {"type": "date", "constraint": "Not null"},
+            "qty": {"type": "integer", "constraint": "Should be > label"},
+            "stock": {"type": "integer", "constraint": "Should be > added"},
+            "price": {"type": "integer", "constraint": "Should not be greater than code"},
+            "updated": {"type": "date", "constraint": "Should be greater than added"}
+        }
+    }
+    mixed_dir, mixed_ids = generator.generate(mixed_schema, seeds=3)
+    problems = []
+    for db_id in mixed_ids:
+        conn = sqlite3.connect(os.path.join(mixed_dir, db_id, f"{db_id}.sqlite"))
+        try:
+            violations = conn.execute('SELECT COUNT(*) FROM "item" WHERE "updated" <= "added"').fetchone()[0]
+        finally:
+            conn.close()
+        if violations:
+            problems.append(f"{db_id}: {violations} rows with updated not after added")
+    print(f"{len(mixed_ids)} instances, violations: {problems or 'none'}")
+
+    low_nulls = DataGenerator(cache_dir, rows=20, null_rate=0.0)
+    print(f"null_rate is part of the cache key: {low_nulls.instance_dir(PDF_SCHEMA) != generator.instance_dir(PDF_SCHEMA)}")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import time
+from modules.dataset import DATABASES_DIR, load_questions, load_generator_schemas, ground_truths
+from modules.data_generator import compile_specs
+from modules.distinguisher import Distinguisher, annotate_dataset, harvest_domains
+from modules.execution_grader import ExecutionGrader
+
+def _grade(evaluate, questions):
+    correct_hits = correct_total = incorrect_hits = incorrect_total = 0
+    start = time.perf_counter()
+    for question in questions:
+        gts = ground_truths(question)
+        for sql in gts:
+            correct_total += 1
+            correct_hits += evaluate(sql, gts, question)["execution_match"]
+        for incorrect in question["queries"]["incorrect_queries"]:
+            incorrect_total += 1
+            incorrect_hits += evaluate(incorrect["query"], gts, question)["execution_match"]
+    elapsed = time.perf_counter() - start
+    return correct_hits, correct_total, incorrect_hits, incorrect_total, elapsed
+
+def run_test():
+    questions = load_questions()
+    schemas = load_generator_schemas()
+    cache_dir = tempfile.mkdtemp(prefix="assessql_distinguish_")
+    output_path = os.path.join(cache_dir, "assessql_distinguishing.json")
+
+    print("--- SCENARIO 1: LITERAL DOMAINS HARVESTED FROM THE QUERIES ---")
+    question = next(q for q in questions if q["db_id"] == "department_management")
+    queries = ground_truths(question) + [q["query"] for q in question["queries"]["incorrect_queries"]]
+    print(f"Question: {question['question']}")
+    print(f"Domains: {harvest_domains(queries, compile_specs(schemas[question['db_id']]))}")
+
+    print("\n--- SCENARIO 2: MINIMAL DISTINGUISHING SETS ---")
+    distinguisher = Distinguisher(cache_dir)
+    start = time.perf_counter()
+    annotated = annotate_dataset(questions, schemas, distinguisher, output_path=output_path)
+    elapsed = time.perf_counter() - start
+
+    killed = sum(len(q["distinguishing_set"]["killed"]) for q in annotated)
+    total = sum(len(q["queries"]["incorrect_queries"]) for q in annotated)
+    sizes = [len(q["distinguishing_set"]["instances"]) for q in annotated]
+    disagreeing = [q["question"] for q in annotated if not q["distinguishing_set"]["gt_agreement"]]
+    print(f"Searched {len(annotated)} questions in {elapsed:.2f}s")
+    print(f"Incorrect queries separated: {killed}/{total} ({killed / total * 100:.1f}%)")
+    print(f"Instances per question: max={max(sizes)}, avg={sum(sizes) / len(sizes):.2f}")
+    print(f"Questions whose GTs never agree on generated data: {len(disagreeing)}")
+    print(f"Example: {json.dumps({k: annotated[0]['distinguishing_set'][k] for k in ('instances', 'killed', 'unkilled')})}")
+
+    print("\n--- SCENARIO 3: GRADING ON THE STORED INSTANCES ---")
+    with open(output_path, "r") as f:
+        stored = json.load(f)
+
+    fixed = ExecutionGrader(DATABASES_DIR)
+    reloaded = Distinguisher(cache_dir)
+
+    results = {
+        "Fixed database": _grade(lambda sql, gts, q: fixed.evaluate(sql, gts, q["db_id"]), stored),
+        "Distinguishing set": _grade(
+            lambda sql, gts, q: reloaded.evaluate(sql, gts, schemas[q["db_id"]], q["distinguishing_set"]), stored
+        )
+    }
+    for label, (correct_hits, correct_total, incorrect_hits, incorrect_total, elapsed) in results.items():
+        print(f"{label}: correct accepted {correct_hits}/{correct_total}, "
+              f"incorrect accepted {incorrect_hits}/{incorrect_total}, {elapsed:.2f}s")
+
+    rebuilt = sum(generator.built for generator in reloaded.generators.values())
+    print(f"Instances rebuilt after reloading the JSON: {rebuilt}")
+
+if __name__ == "__main__":
+    run_test()
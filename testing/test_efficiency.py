@@ -0,0 +1,40 @@
+import io
+from contextlib import redirect_stdout
+from modules.dataset import DATABASES_DIR, load_schemas
+from modules.db_pool import ConnectionPool
+from modules.efficiency import EfficiencyAnalyzer
+from modules.grader import Grader
+
+def run_test():
+    pool = ConnectionPool(DATABASES_DIR)
+    analyzer = EfficiencyAnalyzer(pool, threshold=2.0, deduction=0.1)
+    grader = Grader(load_schemas()["college_2"])
+
+    gt_queries = [
+        "SELECT s.name FROM student s JOIN (SELECT dept_name, AVG(tot_cred) AS avg_cred FROM student GROUP BY dept_name) d ON s.dept_name = d.dept_name WHERE s.tot_cred > d.avg_cred"
+    ]
+
+    students = {
+        "JOIN WITH AGGREGATE": gt_queries[0],
+        "CORRELATED SUBQUERY": "SELECT s.name FROM student s WHERE s.tot_cred > (SELECT AVG(s2.tot_cred) FROM student s2 WHERE s2.dept_name = s.dept_name)",
+        "FILTER WITHOUT INDEX": "SELECT name FROM student WHERE dept_name = 'History' AND tot_cred > 50"
+    }
+
+    for label, student_sql in students.items():
+        print(f"--- {label} ---")
+        with redirect_stdout(io.StringIO()):
+            result = grader.evaluate(student_sql, gt_queries)
+        analyzer.attach(result, student_sql, "college_2")
+
+        report = result["efficiency"]
+        print(f"Query : {student_sql}")
+        print(f"Structural score : {result['percentage']}%")
+        print(f"Steps : student={report['student']['steps']} gold={report['gold']['steps']} ratio={report['cost_ratio']}")
+        print(f"Plan : {report['student']['plan']}")
+        print(f"Full table scans : {report['full_table_scans']}, hints: {report['index_hints']}")
+        print(f"Deduction : {report['deducted_marks']} marks -> {report['adjusted_percentage']}%\n")
+
+    pool.close()
+
+if __name__ == "__main__":
+    run_test()
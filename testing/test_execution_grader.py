@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from modules.dataset import DATABASES_DIR, load_questions, ground_truths
+from modules.db_pool import ConnectionPool
+from modules.execution_grader import ExecutionGrader
+
+def _grade_corpus(grader, questions):
+    correct_hits = 0
+    incorrect_hits = 0
+    correct_total = 0
+    incorrect_total = 0
+
+    for question in questions:
+        gts = ground_truths(question)
+        db_id = question["db_id"]
+
+        for sql in gts:
+            correct_total += 1
+            correct_hits += grader.evaluate(sql, gts, db_id)["execution_match"]
+
+        for incorrect in question["queries"]["incorrect_queries"]:
+            incorrect_total += 1
+            incorrect_hits += grader.evaluate(incorrect["query"], gts, db_id)["execution_match"]
+
+    return correct_hits, correct_total, incorrect_hits, incorrect_total
+
+def run_test():
+    questions = load_questions()
+    cache_path = os.path.join(tempfile.mkdtemp(), "gold_cache.json")
+
+    print("--- EXECUTION GRADING ---")
+    for label in ("cold cache", "warm cache"):
+        grader = ExecutionGrader(DATABASES_DIR, cache_path=cache_path)
+        start = time.perf_counter()
+        correct_hits, correct_total, incorrect_hits, incorrect_total = _grade_corpus(grader, questions)
+        elapsed = time.perf_counter() - start
+        grader.save()
+
+        print(f"{label}: {elapsed:.2f}s")
+        print(f"  correct queries matched   : {correct_hits}/{correct_total}")
+        print(f"  incorrect queries matched : {incorrect_hits}/{incorrect_total}")
+
+    print(f"Gold cache: {os.path.getsize(cache_path)} bytes")
+
+def run_pool_test():
+    pool = ConnectionPool(DATABASES_DIR)
+    sql = "SELECT COUNT(*) FROM head WHERE age > 56"
+    runs = 200
+
+    print("\n--- CONNECTION POOL ---")
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        conn = sqlite3.connect(f"file:{pool.db_path('department_management')}?mode=ro", uri=True)
+        conn.execute(sql).fetchall()
+        conn.close()
+    fresh = (time.perf_counter() - start) / runs
+
+    pool.connection("department_management")
+    start = time.perf_counter()
+    for _ in range(runs):
+        with pool.checkout("department_management") as conn:
+            conn.execute(sql).fetchall()
+    pooled = (time.perf_counter() - start) / runs
+
+    print(f"fresh connection : {fresh * 1e6:.1f}us per query")
+    print(f"pooled snapshot  : {pooled * 1e6:.1f}us per query")
+
+    for statement in ("DELETE FROM head", "PRAGMA query_only = OFF", "CREATE TABLE t (x INT)"):
+        with pool.checkout("department_management") as conn:
+            try:
+                conn.execute(statement)
+                print(f"FAILED. '{statement}' was allowed")
+            except sqlite3.DatabaseError as e:
+                print(f"Rejected '{statement}': {e}")
+
+    with pool.checkout("department_management") as conn:
+        print(f"Rows still in head: {conn.execute('SELECT COUNT(*) FROM head').fetchone()[0]}")
+    pool.close()
+
+def run_guard_test():
+    print("\n--- RUNAWAY QUERY GUARD ---")
+    gts = ["SELECT COUNT(*) FROM takes"]
+    runaway = "SELECT COUNT(*) FROM takes a, takes b, takes c"
+
+    for label, grader in (
+        ("step budget", ExecutionGrader(DATABASES_DIR, max_steps=5_000_000, timeout=None)),
+        ("wall clock", ExecutionGrader(DATABASES_DIR, max_steps=None, timeout=0.5)),
+        ("row cap", ExecutionGrader(DATABASES_DIR, max_rows=500))
+    ):
+        sql = "SELECT * FROM takes a, takes b" if label == "row cap" else runaway
+        start = time.perf_counter()
+        result = grader.evaluate(sql, gts, "college_2")
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12}: {result['execution_error']} after {elapsed:.2f}s, reason={result['resource_limit']['reason']}")
+
+    cache_path = os.path.join(tempfile.mkdtemp(), "gold_cache.json")
+    gold = "SELECT COUNT(*) FROM takes a, takes b"
+    for label, max_steps in (("gold over budget", 10_000), ("budget restored", None)):
+        grader = ExecutionGrader(DATABASES_DIR, cache_path=cache_path, max_steps=max_steps, timeout=None)
+        result = grader.evaluate("SELECT 1", [gold], "college_2")
+        grader.save()
+        cached = grader.gold_cache["college_2"]["gold"].get(gold)
+        print(f"{label:<16}: gold {cached['status'] if cached else 'not cached'}, "
+              f"executions={sum(entry['sql'] == gold for entry in grader.step_log)}, error={result['execution_error']}")
+
+    grader = ExecutionGrader(DATABASES_DIR)
+    grader.evaluate("SELECT name FROM student WHERE tot_cred > 100", ["SELECT name FROM student WHERE tot_cred > 100"], "college_2")
+    for entry in grader.step_log:
+        print(f"Step log: {entry['status']} steps={entry['steps']} sql={entry['sql']}")
+
+def run_streaming_test():
+    print("\n--- STREAMING COMPARISON ---")
+    grader = ExecutionGrader(DATABASES_DIR, max_steps=None, timeout=None, max_rows=None)
+
+    for rows in (10_000, 100_000, 200_000):
+        sql = f"WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < {rows}) SELECT x, x * 2 FROM c"
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = grader.evaluate(sql, [sql], "college_2")
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{rows:>9} rows: match={result['execution_match']} peak={peak / 1024:.0f} KiB time={elapsed:.2f}s")
+
+    gold = "SELECT name FROM student WHERE dept_name = 'History'"
+    runaway = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 3000000) SELECT x FROM c"
+    start = time.perf_counter()
+    result = grader.evaluate(runaway, [gold], "college_2")
+    elapsed = time.perf_counter() - start
+    print(f"Early stop: match={result['execution_match']} rows read={result['row_count']} truncated={result['row_count_truncated']} time={elapsed:.3f}s")
+
+    unordered = grader.evaluate("SELECT name FROM student WHERE dept_name = 'History' ORDER BY name DESC", [gold], "college_2")
+    ordered = grader.evaluate("SELECT name FROM student WHERE dept_name = 'History' ORDER BY name DESC", [gold + " ORDER BY name"], "college_2")
+    print(f"Row order ignored without ORDER BY: {unordered['execution_match']}, enforced with ORDER BY: {not ordered['execution_match']}")
+
+if __name__ == "__main__":
+    run_test()
+    run_pool_test()
+    run_guard_test()
+    run_streaming_test()
@@ -0,0 +1,111 @@
+import io
+import time
+from contextlib import redirect_stdout
+from sqlglot import exp, parse_one
+from modules.dataset import load_questions, load_schemas, submissions
+from modules.grader import Grader
+
+def reference_features(ast):
+    features = set()
+
+    for table in ast.find_all(exp.Table):
+        features.add(f"TABLE:{table.name}")
+
+    for select in ast.find_all(exp.Select):
+        for expression in select.expressions:
+            features.add(f"SELECT:{expression.sql()}")
+
+    def get_conditions(node):
+        if isinstance(node, exp.And):
+            yield from get_conditions(node.left)
+            yield from get_conditions(node.right)
+        else:
+            yield node
+
+    for where in ast.find_all(exp.Where):
+        for condition in get_conditions(where.this):
+            features.add(f"FILTER:{condition.sql()}")
+
+    for join in ast.find_all(exp.Join):
+        if join.args.get("on"):
+            prefix = "OUTER_JOIN_FILTER" if join.args.get("side") else "FILTER"
+            for condition in get_conditions(join.args.get("on")):
+                features.add(f"{prefix}:{condition.sql()}")
+
+    for having in ast.find_all(exp.Having):
+        for condition in get_conditions(having.this):
+            features.add(f"HAVING:{condition.sql()}")
+
+    for group in ast.find_all(exp.Group):
+        for g in group.expressions:
+            features.add(f"GROUP:{g.sql()}")
+
+    for order in ast.find_all(exp.Order):
+        for o in order.expressions:
+            features.add(f"ORDER:{o.sql()}")
+
+    for limit in ast.find_all(exp.Limit):
+        if limit.expression:
+            features.add(f"LIMIT:{limit.expression.sql()}")
+
+    for col_def in ast.find_all(exp.ColumnDef):
+        col_name = col_def.name
+        data_type = col_def.args.get("kind").sql() if col_def.args.get("kind") else "UNKNOWN"
+        features.add(f"COL_DEF:{col_name} TYPE:{data_type}")
+
+        for constraint in col_def.find_all(exp.ColumnConstraint):
+            features.add(f"CONSTRAINT:{col_name}->{constraint.sql()}")
+
+    for constraint in ast.find_all(exp.Constraint):
+        features.add(f"TABLE_CONSTRAINT:{constraint.sql()}")
+
+    return features
+
+def nested_query(depth):
+    sql = "SELECT dept_no FROM emp WHERE salary > 100 ORDER BY dept_no LIMIT 5"
+    for level in range(depth):
+        sql = (f"SELECT e{level}.eno, e{level}.ename FROM emp e{level} JOIN dept d{level} ON e{level}.dept_no = d{level}.dno "
+               f"WHERE e{level}.dept_no IN ({sql}) AND e{level}.salary > {level} "
+               f"GROUP BY e{level}.eno, e{level}.ename HAVING COUNT(*) > 1")
+    return sql
+
+def run_test():
+    schema = {
+        "emp": {"eno": "varchar", "ename": "varchar", "dept_no": "varchar", "salary": "int"},
+        "dept": {"dno": "varchar", "dname": "varchar"}
+    }
+    grader = Grader(schema)
+
+    print("--- FEATURE PARITY ---")
+    asts = []
+    with redirect_stdout(io.StringIO()):
+        schemas = load_schemas()
+        for question in load_questions():
+            corpus_grader = Grader(schemas[question["db_id"]])
+            for sql in submissions(question):
+                ast = corpus_grader._prepare(sql)
+                if ast: asts.append(ast)
+
+        ddl = "CREATE TABLE emp (eno VARCHAR(10) PRIMARY KEY, ename VARCHAR(20) NOT NULL, salary INT DEFAULT 5000, CONSTRAINT fk_dept FOREIGN KEY (dept_no) REFERENCES dept (dno))"
+        asts.append(parse_one(ddl, read="postgres"))
+
+    mismatches = sum(1 for ast in asts if grader._extract_features(ast) != reference_features(ast))
+    print(f"Compared {len(asts)} normalized ASTs, mismatches: {mismatches}")
+
+    print("\n--- NESTED SUBQUERY BENCHMARK ---")
+    for depth in (1, 4, 8, 16):
+        ast = grader._prepare(nested_query(depth))
+        runs = 20
+
+        start = time.perf_counter()
+        for _ in range(runs): reference_features(ast)
+        reference_time = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for _ in range(runs): grader._extract_features(ast)
+        single_pass_time = (time.perf_counter() - start) / runs
+
+        print(f"depth={depth:<3} reference={reference_time * 1000:.2f}ms single-pass={single_pass_time * 1000:.2f}ms speedup={reference_time / single_pass_time:.1f}x")
+
+if __name__ == "__main__":
+    run_test()
@@ -1,3 +1,4 @@
+import time
 from modules.grader import Grader
 
 def run_test():
@@ -48,5 +49,55 @@ def run_test():
     print(f"Query : {student_5}")
     print(f"Result : {result_5}")
 
+
+    print("\n--- SCENARIO 6 (BATCH) ---")
+    students = [student_1, student_2, student_3, student_4, student_5]
+    question = grader.compile(gt_queries)
+    batch_results = grader.evaluate_batch(students, question)
+    for student, result in zip(students, batch_results):
+        single = grader.evaluate(student, gt_queries)
+        status = "OK" if result["percentage"] == single["percentage"] and result["matched_gt"] == single["matched_gt"] else "MISMATCH"
+        print(f"{status} : {result['percentage']}% -> {result['matched_gt']}")
+    print(f"Exact-match hit rate : {question.exact_hits}/{question.lookups} ({question.hit_rate:.0%})")
+
+def run_commutative_test():
+    schema = {
+        "emp": {"eno": "varchar", "ename": "varchar", "dept_no": "varchar", "salary": "int"}
+    }
+
+    grader = Grader(schema)
+
+    print("\n--- SCENARIO 7 (COMMUTATIVE ORDERING) ---")
+    forward = "SELECT eno FROM emp WHERE dept_no = 'D1' OR salary + 10 > 500 OR ename = 'A'"
+    backward = "SELECT eno FROM emp WHERE ename = 'A' OR (10 + salary > 500 OR 'D1' = dept_no)"
+    canon_forward = grader.processor.get_canonical_sql(grader._prepare(forward))
+    canon_backward = grader.processor.get_canonical_sql(grader._prepare(backward))
+    print(f"Canonical : {canon_forward}")
+    print("SUCCESS! Operand order is canonical." if canon_forward == canon_backward else f"FAILED. Got {canon_backward}")
+
+    print("\n--- SCENARIO 8 (LONG OR CHAIN) ---")
+    for terms in (100, 200, 400, 800):
+        sql = "SELECT eno FROM emp WHERE " + " OR ".join(f"salary = {terms - i}" for i in range(terms))
+        ast = grader.processor.parse_and_optimize(sql)
+
+        start = time.perf_counter()
+        grader._normalize_ast(ast)
+        elapsed = time.perf_counter() - start
+        print(f"{terms} terms : {elapsed * 1000:.1f}ms")
+
+    forward = "SELECT eno FROM emp WHERE " + " OR ".join(f"salary = {i}" for i in range(200))
+    backward = "SELECT eno FROM emp WHERE " + " OR ".join(f"salary = {i}" for i in reversed(range(200))) + " OR salary = 7"
+    same = grader._normalize_ast(grader.processor.parse_and_optimize(forward)).sql() == grader._normalize_ast(grader.processor.parse_and_optimize(backward)).sql()
+    print(f"Reordered chain with a duplicate term normalizes identically: {same}")
+
+    flat = "SELECT eno FROM emp WHERE " + " OR ".join(f"salary = {i}" for i in range(40))
+    regrouped = "SELECT eno FROM emp WHERE (" + " OR ".join(f"salary = {i}" for i in range(39)) + ") OR salary = 39"
+    print(f"Regrouped 40-term chain vs flat: {grader.evaluate(regrouped, [flat])['percentage']}%")
+    print(f"40-term chain OR TRUE vs no filter: {grader.evaluate(flat + ' OR TRUE', ['SELECT eno FROM emp'])['percentage']}%")
+
+    huge = "SELECT eno FROM emp WHERE " + " OR ".join(f"eno = {i}" for i in range(1000))
+    print(f"1000-term chain graded against itself: {grader.evaluate(huge, [huge])['percentage']}%")
+
 if __name__ == "__main__":
-    run_test()
\ No newline at end of file
+    run_test()
+    run_commutative_test()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import io
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from modules.dataset import load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+
+def _measure(questions, schemas, in_place):
+    graders = {}
+    peaks = []
+    count = 0
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for question in questions:
+            db_id = question["db_id"]
+            if db_id not in graders:
+                graders[db_id] = Grader(schemas[db_id], cache_size=0, in_place=in_place)
+            grader = graders[db_id]
+
+            for sql in submissions(question):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                ast = grader._prepare(sql)
+                if ast: grader._extract_features(ast)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+                count += 1
+    elapsed = time.perf_counter() - start
+
+    peaks.sort()
+    return count, elapsed, peaks[len(peaks) // 2], peaks[-1]
+
+def run_test():
+    questions = load_questions()
+    schemas = load_schemas()
+
+    print("--- IN-PLACE NORMALIZATION ---")
+    results = {}
+    tracemalloc.start()
+    for in_place in (False, True):
+        count, elapsed, median_peak, max_peak = _measure(questions, schemas, in_place)
+        results[in_place] = median_peak
+        mode = "in-place" if in_place else "copying"
+        print(f"{mode:<9}: {count} submissions, median peak {median_peak / 1024:.1f} KiB, max peak {max_peak / 1024:.1f} KiB")
+    tracemalloc.stop()
+
+    for in_place in (False, True):
+        start = time.perf_counter()
+        count, _, _, _ = _measure(questions, schemas, in_place)
+        elapsed = time.perf_counter() - start
+        mode = "in-place" if in_place else "copying"
+        print(f"{mode:<9}: {count / elapsed:.1f} submissions/s")
+
+    print(f"\nPeak reduction: {(1 - results[True] / results[False]) * 100:.1f}%")
+
+    print("\n--- RESULT PARITY ---")
+    with redirect_stdout(io.StringIO()):
+        mismatches = 0
+        for question in questions:
+            copying = Grader(schemas[question["db_id"]], cache_size=0)
+            in_place = Grader(schemas[question["db_id"]], cache_size=0, in_place=True)
+            a = copying.evaluate_batch(submissions(question), ground_truths(question))
+            b = in_place.evaluate_batch(submissions(question), ground_truths(question))
+            mismatches += sum(1 for x, y in zip(a, b) if x != y)
+    print(f"Mismatched results: {mismatches}")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,61 @@
+import io
+import time
+from contextlib import redirect_stdout
+from modules.dataset import load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+from modules.instrumentation import Instrumentation, TimingSummary
+
+def _grade_all(questions, schemas, instrumentation=None):
+    results = []
+    with redirect_stdout(io.StringIO()):
+        for q in questions:
+            grader = Grader(schemas[q["db_id"]], cache_size=0, instrumentation=instrumentation)
+            for sql in submissions(q):
+                results.append(grader.evaluate(sql, ground_truths(q)))
+    return results
+
+def run_test():
+    questions = load_questions()[:15]
+    schemas = load_schemas()
+
+    print("--- SCENARIO 1: PER-RESULT TIMINGS ---")
+    instrumentation = Instrumentation()
+    timed = _grade_all(questions, schemas, instrumentation)
+    plain = _grade_all(questions, schemas)
+    records = [result.pop("timings") for result in timed]
+    print(f"{len(records)} results carry timings, scores identical to uninstrumented run: {timed == plain}")
+    sample = next(r for r in records if "extract_features" in r)
+    for stage, entry in sample.items():
+        nodes = f" nodes={entry['nodes']}" if "nodes" in entry else ""
+        print(f"  {stage:<20} {entry['ms']:>8.3f}ms{nodes}")
+    stage_sum = sum(entry["ms"] for stage, entry in sample.items() if stage != "total")
+    print(f"Stages cover the total: {stage_sum <= sample['total']['ms']}")
+
+    print("\n--- SCENARIO 2: RUN SUMMARY ---")
+    print(instrumentation.summary.format())
+    rebuilt = TimingSummary()
+    for record in records:
+        rebuilt.add(record)
+    print(f"Summary rebuilt from result timings matches: {rebuilt.as_dict() == instrumentation.summary.as_dict()}")
+
+    print("\n--- SCENARIO 3: BATCH GRADING AMORTIZES SCORING ---")
+    q = questions[0]
+    batch_timer = Instrumentation()
+    with redirect_stdout(io.StringIO()):
+        batch = Grader(schemas[q["db_id"]], instrumentation=batch_timer).evaluate_batch(submissions(q), ground_truths(q))
+    scored = [r["timings"] for r in batch if "score" in r["timings"]]
+    print(f"{len(batch)} results, {len(scored)} scored by the matrix")
+    print(f"Runs in summary: {batch_timer.summary.runs} ({len(batch)} submissions + {len(ground_truths(q))} ground truths parsed by compile)")
+
+    print("\n--- SCENARIO 4: OVERHEAD ---")
+    for label, timer in (("off", None), ("on", Instrumentation()), ("on, no node counts", Instrumentation(nodes=False))):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            _grade_all(questions, schemas, timer)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"instrumentation {label:<20}: {best:.3f}s")
+
+if __name__ == "__main__":
+    run_test()
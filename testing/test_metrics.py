@@ -0,0 +1,99 @@
+import io
+import os
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from modules.dataset import DATABASES_DIR, BASE_DIR, load_questions, load_schemas, ground_truths, submissions
+from modules.execution_grader import ExecutionGrader
+from modules.grader import Grader, GRADED, EXACT_MATCHES, QUESTION_LATENCY, BATCH_LATENCY, exact_match_hit_rate, question_label
+from modules.metrics import REGISTRY, MetricsRegistry
+from modules.parallel import ParallelGrader
+from modules.pdf_extractor import PDFExtractor
+from modules.sql_processor import SYNTAX_REJECTIONS, PARSE_CACHE
+
+def _graded():
+    return {outcome: GRADED.get(outcome) for outcome in ("correct", "partial", "error")}
+
+def _exact_matches():
+    return {result: sum(v for (_, r), v in EXACT_MATCHES.values.items() if r == result) for result in ("hit", "miss")}
+
+def run_test():
+    questions = load_questions()[:10]
+    schemas = load_schemas()
+
+    print("--- SCENARIO 1: GRADER AND SQLProcessor COUNTERS ---")
+    REGISTRY.reset()
+    total = 0
+    with redirect_stdout(io.StringIO()):
+        for q in questions:
+            grader = Grader(schemas[q["db_id"]])
+            for sql in submissions(q) + ["SELEC broken"]:
+                grader.evaluate(sql, ground_truths(q))
+                total += 1
+    serial = _graded()
+    latency_count = sum(QUESTION_LATENCY.count(question_label(ground_truths(q))) for q in questions)
+    print(f"{total} submissions -> graded {serial}, latency observations: {latency_count}")
+    print(f"syntax rejections: {SYNTAX_REJECTIONS.get()}, parse cache hit/miss: {PARSE_CACHE.get('hit')}/{PARSE_CACHE.get('miss')}")
+    serial_exact = _exact_matches()
+    print(f"exact-match lookups {serial_exact}, hit rate {exact_match_hit_rate():.1%}")
+
+    print("\n--- SCENARIO 2: PROCESS POOL COUNTERS MERGE INTO THE PARENT ---")
+    REGISTRY.reset()
+    with redirect_stdout(io.StringIO()):
+        with ParallelGrader({q["db_id"]: schemas[q["db_id"]] for q in questions}, jobs=2) as pool:
+            pool.evaluate_many([(submissions(q) + ["SELEC broken"], ground_truths(q), q["db_id"]) for q in questions])
+    print(f"jobs=2 graded {_graded()}, identical to serial: {_graded() == serial}")
+    print(f"jobs=2 exact-match lookups {_exact_matches()}, identical to serial: {_exact_matches() == serial_exact}")
+    labels = [question_label(ground_truths(q)) for q in questions]
+    print(f"jobs=2 latency observations: per-submission {sum(QUESTION_LATENCY.count(l) for l in labels)}, "
+          f"per-batch {sum(BATCH_LATENCY.count(l) for l in labels)} (one per chunk)")
+
+    worker = MetricsRegistry()
+    counter = worker.counter("assessql_submissions_graded_total", "Submissions graded by outcome.", ("outcome",))
+    counter.inc("correct", amount=5)
+    before = GRADED.get("correct")
+    REGISTRY.merge(worker.drain())
+    print(f"Merging a worker snapshot adds 5: {GRADED.get('correct') - before == 5}, worker drained: {counter.get('correct') == 0}")
+
+    parent = MetricsRegistry()
+    worker = MetricsRegistry()
+    worker.counter("assessql_submissions_graded_total", "Submissions graded by outcome.", ("outcome",)).inc("correct")
+    worker.histogram("assessql_question_seconds", "Grading latency per question.", ("question",)).observe(0.01, "q")
+    snapshot = worker.snapshot()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: parent.merge(snapshot), range(8000)))
+    merged = parent.families["assessql_submissions_graded_total"].get("correct")
+    observed = parent.families["assessql_question_seconds"].count("q")
+    print(f"8000 merges from 8 threads: counter {merged:.0f}, histogram count {observed}")
+
+    print("\n--- SCENARIO 3: EXECUTION LIMITS AND PDF EXTRACTION ---")
+    ExecutionGrader(DATABASES_DIR, max_steps=None, timeout=0.2).evaluate(
+        "SELECT COUNT(*) FROM takes a, takes b, takes c", ["SELECT COUNT(*) FROM takes"], "college_2")
+    PDFExtractor(os.path.join(BASE_DIR, "testing", "lab1.pdf")).process()
+    for line in REGISTRY.render().splitlines():
+        if line.startswith(("assessql_execution_limits", "assessql_executions_total", "assessql_pdf_documents", "assessql_pdf_pages")):
+            print(line)
+
+    print("\n--- SCENARIO 4: PROMETHEUS TEXT EXPORT ---")
+    path = os.path.join(tempfile.mkdtemp(), "assessql.prom")
+    REGISTRY.write(path)
+    with open(path) as f:
+        written = f.read()
+    print(f"Wrote {len(written.splitlines())} lines to file")
+    label = question_label(ground_truths(questions[0]))
+    for line in written.splitlines():
+        if line == "# TYPE assessql_question_latency_seconds histogram" or \
+                (f'question="{label}"' in line and ('le="+Inf"' in line or "_bucket" not in line)):
+            print(line)
+
+    server = REGISTRY.serve("127.0.0.1", 0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            body = response.read().decode("utf-8")
+            print(f"HTTP {response.status} {response.headers['Content-Type']}, matches file: {body == written}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,44 @@
+import io
+import os
+import time
+from contextlib import redirect_stdout
+from modules.dataset import load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+from modules.parallel import ParallelGrader
+
+def _summary(result):
+    if "error" in result:
+        return ("ERROR",)
+    return (result["matched_gt"], result["obtained_marks"], result["total_marks"], result["percentage"])
+
+def run_test():
+    questions = load_questions()
+    all_schemas = load_schemas()
+    schemas = {q["db_id"]: all_schemas[q["db_id"]] for q in questions}
+    batches = [(submissions(q), ground_truths(q), q["db_id"]) for q in questions]
+    total = sum(len(b[0]) for b in batches)
+
+    print(f"--- PARALLEL GRADING: {len(questions)} questions, {total} submissions ---")
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        graders = {db_id: Grader(schema) for db_id, schema in schemas.items()}
+        serial = [graders[db_id].evaluate_batch(subs, gts) for subs, gts, db_id in batches]
+    serial_time = time.perf_counter() - start
+    print(f"Serial      : {serial_time:.2f}s ({total / serial_time:.1f} submissions/s)")
+
+    expected = [[_summary(r) for r in batch] for batch in serial]
+
+    job_counts = sorted({1, 2, os.cpu_count() or 1})
+    for jobs in job_counts:
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            with ParallelGrader(schemas, jobs=jobs) as pool:
+                parallel = pool.evaluate_many(batches)
+        elapsed = time.perf_counter() - start
+
+        status = "OK" if [[_summary(r) for r in batch] for batch in parallel] == expected else "MISMATCH"
+        print(f"jobs={jobs:<8}: {elapsed:.2f}s ({total / elapsed:.1f} submissions/s) {status}")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,92 @@
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from modules.dataset import load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+from modules.regrade import IncrementalRegrader
+
+def _canonical(result):
+    if result is None or "feedback" not in result:
+        return result
+    feedback = {key: sorted(values) for key, values in result["feedback"].items()}
+    return dict(result, feedback=feedback)
+
+def _full(grader, subs, gts):
+    question = grader.compile(gts)
+    return {idx: grader.evaluate_compiled(sql, question) for idx, sql in subs.items()}
+
+def _same(incremental, full):
+    return sum(_canonical(incremental[idx]) != _canonical(full[idx]) for idx in full)
+
+def run_test():
+    schemas = load_schemas()
+    questions = [q for q in load_questions() if len(ground_truths(q)) >= 3]
+
+    print(f"--- INCREMENTAL REGRADING: {len(questions)} questions with 3+ ground truths ---")
+    totals = {"initial": 0, "added": 0, "removed": 0, "changed_add": 0, "changed_remove": 0, "submissions": 0}
+    timings = {"incremental_add": 0.0, "full_add": 0.0, "incremental_remove": 0.0, "full_remove": 0.0}
+    comparisons = {"incremental": 0, "full": 0}
+
+    with redirect_stdout(io.StringIO()):
+        for q in questions:
+            gts = ground_truths(q)
+            subs = {idx: sql for idx, sql in enumerate(submissions(q) * 3)}
+            grader = Grader(schemas[q["db_id"]])
+            regrader = IncrementalRegrader(grader, gts[:-1])
+            initial = regrader.grade(subs)
+            totals["initial"] += sum(initial[idx] != r for idx, r in _full(grader, subs, gts[:-1]).items())
+            totals["submissions"] += len(subs)
+
+            before = regrader.comparisons
+            start = time.perf_counter()
+            totals["changed_add"] += len(regrader.add_ground_truth(gts[-1]))
+            timings["incremental_add"] += time.perf_counter() - start
+            comparisons["incremental"] += regrader.comparisons - before
+
+            start = time.perf_counter()
+            full = _full(Grader(schemas[q["db_id"]], cache_size=0), subs, gts)
+            timings["full_add"] += time.perf_counter() - start
+            comparisons["full"] += len(subs) * len(gts)
+            totals["added"] += _same(regrader.results(), full)
+
+            start = time.perf_counter()
+            totals["changed_remove"] += len(regrader.remove_ground_truth(gts[0]))
+            timings["incremental_remove"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            full = _full(Grader(schemas[q["db_id"]], cache_size=0), subs, gts[1:])
+            timings["full_remove"] += time.perf_counter() - start
+            totals["removed"] += _same(regrader.results(), full)
+
+    print(f"Initial grading identical to Grader.evaluate_compiled: {totals['initial'] == 0} ({totals['initial']} differences)")
+    print(f"Add GT   : {totals['changed_add']}/{totals['submissions']} results raised, "
+          f"{comparisons['incremental']} GT comparisons vs {comparisons['full']} for a full regrade")
+    print(f"           incremental {timings['incremental_add']:.3f}s vs full regrade {timings['full_add']:.2f}s, "
+          f"matches full regrade: {totals['added'] == 0} ({totals['added']} differences)")
+    print(f"Remove GT: {totals['changed_remove']}/{totals['submissions']} results recomputed")
+    print(f"           incremental {timings['incremental_remove']:.3f}s vs full regrade {timings['full_remove']:.2f}s, "
+          f"matches full regrade: {totals['removed'] == 0} ({totals['removed']} differences)")
+
+    print("\n--- SAVED STATE SURVIVES A RESTART ---")
+    q = questions[0]
+    gts = ground_truths(q)
+    path = os.path.join(tempfile.mkdtemp(), "regrade.json")
+    with redirect_stdout(io.StringIO()):
+        grader = Grader(schemas[q["db_id"]])
+        regrader = IncrementalRegrader(grader, gts[:1])
+        regrader.grade({f"s{idx}": sql for idx, sql in enumerate(submissions(q))})
+        regrader.save(path)
+        restored = IncrementalRegrader.load(path, Grader(schemas[q["db_id"]]))
+        changed = restored.add_ground_truth(gts[1])
+        regrader.add_ground_truth(gts[1])
+    print(f"Reloaded {len(restored.submissions)} submissions, {len(changed)} raised by the new GT, same as in-memory: {restored.results() == regrader.results()}")
+
+    try:
+        restored.remove_ground_truth("SELECT 1")
+    except ValueError as e:
+        print(f"Removing an unknown GT: {e}")
+
+if __name__ == "__main__":
+    run_test()
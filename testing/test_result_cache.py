@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from modules.dataset import BASE_DIR, load_questions, load_schemas, ground_truths, submissions
+from modules.grader import GRADER_VERSION
+from modules.result_cache import ResultCache
+
+CLI = os.path.join(BASE_DIR, "assessql.py")
+
+def _write_bank(path, questions, schemas, tweak=None):
+    bank = {
+        "schemas": {q["db_id"]: schemas[q["db_id"]] for q in questions},
+        "questions": {str(i): {"schema": q["db_id"], "ground_truths": ground_truths(q)} for i, q in enumerate(questions)}
+    }
+    if tweak is not None:
+        bank["questions"][tweak]["ground_truths"] = bank["questions"][tweak]["ground_truths"][:1]
+    with open(path, "w") as f:
+        json.dump(bank, f)
+
+def _grade(bank_path, input_path, cache_dir):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, CLI, "grade", "-q", bank_path, input_path, "--cache-dir", cache_dir, "--verbose"],
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    stats = next(line for line in proc.stderr.splitlines() if "result cache:" in line)
+    return [json.loads(line) for line in proc.stdout.splitlines()], elapsed, stats.split("] ")[-1]
+
+def run_test():
+    questions = load_questions()[:30]
+    schemas = load_schemas()
+    work_dir = tempfile.mkdtemp(prefix="assessql_results_")
+    bank_path = os.path.join(work_dir, "bank.json")
+    input_path = os.path.join(work_dir, "semester.jsonl")
+    cache_dir = os.path.join(work_dir, "cache")
+    _write_bank(bank_path, questions, schemas)
+
+    with open(input_path, "w") as f:
+        idx = 0
+        for term in range(3):
+            for q_idx, q in enumerate(questions):
+                for sql in submissions(q):
+                    f.write(json.dumps({"submission_id": idx, "question_id": str(q_idx), "sql": sql}) + "\n")
+                    idx += 1
+
+    print("--- SCENARIO 1: REGRADING AN UNCHANGED SEMESTER ---")
+    cold, cold_time, cold_stats = _grade(bank_path, input_path, cache_dir)
+    warm, warm_time, warm_stats = _grade(bank_path, input_path, cache_dir)
+    print(f"cold: {len(cold)} results in {cold_time:.2f}s ({cold_stats})")
+    print(f"warm: {len(warm)} results in {warm_time:.2f}s ({warm_stats})")
+    print(f"Identical results: {cold == warm}")
+
+    print("\n--- SCENARIO 2: RUBRIC TWEAK ON ONE QUESTION ---")
+    _write_bank(bank_path, questions, schemas, tweak="4")
+    tweaked, tweak_time, tweak_stats = _grade(bank_path, input_path, cache_dir)
+    changed = sum(a != b for a, b in zip(cold, tweaked))
+    print(f"{tweak_time:.2f}s ({tweak_stats}), {changed} results changed")
+
+    print("\n--- SCENARIO 3: GRADER VERSION BUMP ---")
+    path = os.path.join(cache_dir, "results.sqlite")
+    with ResultCache(path) as cache:
+        before = len(cache)
+    with ResultCache(path, version=GRADER_VERSION + 1) as cache:
+        print(f"{before} entries at version {GRADER_VERSION}; opening as version {GRADER_VERSION + 1} dropped {cache.invalidated}, {len(cache)} left")
+
+    print("\n--- SCENARIO 4: SIZE-BOUNDED LRU EVICTION ---")
+    with ResultCache(os.path.join(work_dir, "small.sqlite"), max_entries=100, flush_every=50) as cache:
+        for i in range(100):
+            cache.put("q", f"s{i}", {"percentage": float(i)})
+        cache.flush()
+        for i in range(100, 250):
+            if i % 50 == 0:
+                cache.get("q", "s0")
+            cache.put("q", f"s{i}", {"percentage": float(i)})
+        cache.flush()
+        print(f"250 puts with max_entries=100: {len(cache)} kept, {cache.evictions} evicted")
+        print(f"Entry read between batches kept: {cache.get('q', 's0') is not None}, oldest unread evicted: {cache.get('q', 's1') is None}")
+
+        cache.flush()
+        peak = 0
+        for _ in range(5):
+            for i in range(150, 250):
+                cache.get("q", f"s{i}")
+                peak = max(peak, len(cache._touched))
+        print(f"500 hits with flush_every=50: at most {peak} pending last-used updates")
+
+if __name__ == "__main__":
+    run_test()
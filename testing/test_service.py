@@ -0,0 +1,125 @@
+import asyncio
+import io
+import json
+import random
+import time
+from contextlib import redirect_stdout
+from modules.dataset import load_questions, load_schemas, ground_truths, submissions
+from modules.grader import Grader
+from modules.question_bank import QuestionBank
+from modules.service import GradingService
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers["content-length"]))
+    writer.close()
+    return int(status_line.split()[1]), json.loads(data)
+
+def _bank(questions, schemas):
+    return QuestionBank(
+        {q["db_id"]: schemas[q["db_id"]] for q in questions},
+        {str(i): (q["db_id"], ground_truths(q)) for i, q in enumerate(questions)}
+    )
+
+def _workload(questions, count, seed=3):
+    rng = random.Random(seed)
+    work = []
+    for idx in range(count):
+        q_idx = rng.randrange(len(questions))
+        work.append({"submission_id": idx, "question_id": str(q_idx), "sql": rng.choice(submissions(questions[q_idx]))})
+    return work
+
+async def _burst(service, work):
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[_request(service.port, "POST", "/grade", item) for item in work])
+    return responses, time.perf_counter() - start
+
+async def run_scenarios():
+    questions = load_questions()[:8]
+    schemas = load_schemas()
+    bank = _bank(questions, schemas)
+    work = _workload(questions, 400)
+
+    with redirect_stdout(io.StringIO()):
+        graders = {q["db_id"]: Grader(schemas[q["db_id"]]) for q in questions}
+        expected = [graders[questions[int(w["question_id"])]["db_id"]].evaluate(w["sql"], ground_truths(questions[int(w["question_id"])])) for w in work]
+
+    print("--- SCENARIO 1: CONCURRENT REQUESTS ARE MICRO-BATCHED ---")
+    configs = (("no batching (max_batch=1)", 1, 1), ("micro-batching (max_batch=32)", 32, 1),
+               ("micro-batching, process pool (jobs=2)", 32, 2))
+    for label, max_batch, jobs in configs:
+        service = GradingService(bank, jobs=jobs, max_batch=max_batch, max_delay=0.005, max_pending=1000)
+        service.warm()
+        await service.start("127.0.0.1", 0)
+        with redirect_stdout(io.StringIO()):
+            responses, elapsed = await _burst(service, work)
+        metrics = (await _request(service.port, "GET", "/metrics"))[1]
+        await service.close()
+
+        statuses = {status for status, _ in responses}
+        same = all({k: v for k, v in body.items() if k not in ("submission_id", "question_id")} == result
+                   for (_, body), result in zip(responses, expected))
+        print(f"{label}: {len(work)} requests in {elapsed:.2f}s, statuses={sorted(statuses)}, identical={same}")
+        print(f"  batches={metrics['batches']} avg_batch_size={metrics['avg_batch_size']} "
+              f"p50={metrics['latency_p50_ms']:.1f}ms p99={metrics['latency_p99_ms']:.1f}ms")
+
+    print("\n--- SCENARIO 2: BACKPRESSURE ---")
+    service = GradingService(bank, max_batch=16, max_delay=0.005, max_pending=50)
+    service.warm()
+    await service.start("127.0.0.1", 0)
+    with redirect_stdout(io.StringIO()):
+        responses, _ = await _burst(service, work[:300])
+    metrics = (await _request(service.port, "GET", "/metrics"))[1]
+    await service.close()
+    accepted = sum(status == 200 for status, _ in responses)
+    rejected = sum(status == 503 for status, _ in responses)
+    print(f"max_pending=50, burst of 300: accepted={accepted} rejected(503)={rejected} metrics.rejected={metrics['rejected']}")
+
+    print("\n--- SCENARIO 3: BAD REQUESTS ---")
+    service = GradingService(bank)
+    await service.start("127.0.0.1", 0)
+    checks = [
+        ("unknown question", "POST", "/grade", {"question_id": "999", "sql": "SELECT 1"}),
+        ("missing sql", "POST", "/grade", {"question_id": "0"}),
+        ("wrong method", "GET", "/grade", None),
+        ("unknown route", "GET", "/nope", None),
+        ("health", "GET", "/health", None)
+    ]
+    for label, method, path, payload in checks:
+        status, body = await _request(service.port, method, path, payload)
+        print(f"{label}: {status} {body}")
+    await service.close()
+
+    print("\n--- SCENARIO 4: QUESTION WITHOUT A VALID GROUND TRUTH ---")
+    broken_bank = QuestionBank(bank.schemas, dict(bank.questions, broken=(questions[0]["db_id"], ["from head select age"])))
+    for jobs in (1, 2):
+        service = GradingService(broken_bank, jobs=jobs)
+        await service.start("127.0.0.1", 0)
+        with redirect_stdout(io.StringIO()):
+            responses, _ = await _burst(service, [
+                {"submission_id": "a", "question_id": "broken", "sql": submissions(questions[0])[0]},
+                {"submission_id": "b", "question_id": "0", "sql": submissions(questions[0])[0]}
+            ])
+        await service.close()
+        print(f"jobs={jobs}: {[(status, body.get('error', body['percentage'])) for status, body in responses]}")
+
+def run_test():
+    asyncio.run(run_scenarios())
+
+if __name__ == "__main__":
+    run_test()
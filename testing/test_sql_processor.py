@@ -1,3 +1,9 @@
+import io
+import time
+from contextlib import redirect_stdout
+import pickle
+from sqlglot import exp, parse_one
+from sqlglot.optimizer.qualify import qualify
 from modules.sql_processor import SQLProcessor
 
 def run_test():
@@ -48,5 +54,116 @@ def run_test():
     else:
         print("FAILED. The normalizer didn't converge.")
 
+def run_cache_test():
+    schema = {
+        "emp": {"eno": "varchar", "ename": "varchar", "dept_no": "varchar"}
+    }
+
+    processor = SQLProcessor(schema, cache_size=2)
+    identity = lambda expression: expression
+
+    print("\n--- CACHE SCENARIO ---")
+
+    submissions = [
+        "SELECT eno, ename FROM emp WHERE dept_no = 'D1'",
+        "select   ENO, ename\nfrom EMP where dept_no = 'D1';",
+        "SELECT eno, ename FROM emp WHERE dept_no = 'd1'",
+        "SELECT eno FROM emp",
+        "SELECT eno, ename FROM emp WHERE dept_no = 'D1'"
+    ]
+
+    for sql in submissions:
+        ast = processor.parse_normalized(sql, identity)
+        ast.set("where", None)
+        print(f"Key {processor.cache_key(sql)[:12]} <- {sql!r}")
+
+    print(f"Stats: {processor.cache.stats()}")
+
+    processor.schema = {"emp": {"eno": "varchar"}}
+    print(f"After schema change: {processor.cache.stats()}")
+
+    first = processor.parse_normalized(submissions[0], identity)
+    print(f"Canonical after copy-on-read: {processor.get_canonical_sql(first)}")
+
+    print("\n--- CACHE KEY COLLISIONS ---")
+    processor = SQLProcessor(schema)
+    pairs = [
+        ("-- don't\nSELECT eno FROM emp WHERE ename = 'Bob'", "-- don't\nSELECT eno FROM emp WHERE ename = 'bob'"),
+        ("/* it's */ SELECT eno FROM emp WHERE ename = 'Bob'", "/* it's */ SELECT eno FROM emp WHERE ename = 'bob'"),
+        ("SELECT eno FROM emp WHERE ename = $$Bob$$", "SELECT eno FROM emp WHERE ename = $$bob$$")
+    ]
+    for upper, lower in pairs:
+        distinct = processor.cache_key(upper) != processor.cache_key(lower)
+        upper_ast = processor.parse_normalized(upper, identity)
+        lower_ast = processor.parse_normalized(lower, identity)
+        literal = lower_ast.find(exp.Literal, exp.RawString) if lower_ast else None
+        print(f"Distinct keys: {distinct}, 'bob' submission keeps its literal: {literal is not None and literal.this == 'bob'} <- {lower!r}")
+
+def run_rejection_test():
+    schema = {
+        "emp": {"eno": "varchar", "ename": "varchar", "dept_no": "varchar"}
+    }
+
+    processor = SQLProcessor(schema)
+
+    print("\n--- REJECTION SCENARIO ---")
+
+    valid = [
+        "SELECT eno, ename FROM emp WHERE dept_no = 'D1'",
+        "-- list employees\nselect eno FROM emp",
+        "/* names */ SELECT ename FROM emp ORDER BY ename"
+    ]
+    invalid = [
+        "",
+        "   ",
+        "I think the answer is to select all employees from emp",
+        "from EMP f SELECT f.ENO",
+        "CREATE TABLE emp (eno varchar)",
+        "SELECT eno FROM emp WHERE ename = 'unterminated",
+        "select eno from emp where ename = E'a\\'b'"
+    ]
+
+    for label, queries in (("valid", valid), ("invalid", invalid)):
+        runs = 50
+        with redirect_stdout(io.StringIO()):
+            outcomes = [processor.parse_and_optimize(sql) is not None for sql in queries]
+            start = time.perf_counter()
+            for _ in range(runs):
+                for sql in queries:
+                    processor.parse_and_optimize(sql)
+            elapsed = (time.perf_counter() - start) / (runs * len(queries))
+        print(f"{label:<8}: accepted {sum(outcomes)}/{len(queries)}, {elapsed * 1e6:.1f}us per submission")
+
+def run_schema_test():
+    schema = {
+        "EMP": {"eno": "varchar", "ename": "varchar", "basic-sal": "integer", "incentive": "integer", "dept_no": "varchar", "mgr_id": "varchar"},
+        "DEPT": {"dno": "varchar", "dname": "varchar", "location": "varchar"},
+        "PROJECT": {"pno": "varchar", "pname": "varchar", "dno": "varchar"},
+        "WORKS_ON": {"eno": "varchar", "pno": "varchar", "hours": "integer"}
+    }
+
+    processor = SQLProcessor(schema)
+
+    print("\n--- COMPILED SCHEMA SCENARIO ---")
+    sql = "select e.eno, d.dname from emp e join dept d on e.dept_no = d.dno where e.eno in (select w.eno from works_on w)"
+    expression = parse_one(sql, read="postgres")
+
+    runs = 200
+    for label, qualify_schema in (("dict", processor.schema), ("compiled", processor.compiled_schema)):
+        start = time.perf_counter()
+        for _ in range(runs):
+            qualify(expression.copy(), schema=qualify_schema, quote_identifiers=False, validate_qualify_columns=False)
+        elapsed = (time.perf_counter() - start) / runs
+        print(f"qualify with {label:<8} schema: {elapsed * 1e6:.1f}us")
+
+    payload = pickle.dumps(processor.compiled_schema)
+    restored = SQLProcessor(pickle.loads(payload))
+    ast = restored.parse_and_optimize(sql)
+    print(f"Pickled schema: {len(payload)} bytes, tables {sorted(restored.schema)}")
+    print(f"Canonical from restored schema: {restored.get_canonical_sql(ast)}")
+
 if __name__ == "__main__":
-    run_test()
\ No newline at end of file
+    run_test()
+    run_cache_test()
+    run_rejection_test()
+    run_schema_test()
\ No newline at end of file